@@ -1,18 +1,33 @@
 import asyncio
 import json
 import logging
+import logging.handlers
+import queue
+import atexit
 import os
 import signal
 import sys
 from datetime import datetime
 import websockets
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import threading
 import mimetypes
 from io import BytesIO
-from urllib.parse import urlparse, parse_qsl
+from urllib.parse import urlparse, parse_qsl, urlencode
 import time
-import shutil
+import hashlib
+import gzip
+import math
+import bisect
+from array import array
+from collections import OrderedDict
+from datetime import timedelta
+from PIL import Image, ImageDraw, ImageFont
+from frame_store import FrameStore, parse_frame_timestamp
+from frame_export import EXPORT_FORMATS, Throttle, stream_tar, stream_zip
+from event_journal import EventJournal
+from frame_compaction import FrameCompactor, CompactionThread
+from frame_activity import ActivityIndex
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +36,167 @@ logging.basicConfig(
 )
 logger = logging.getLogger('combined_server')
 
+# Default settings for the logging pipeline (admin_config.json "logging")
+DEFAULT_LOGGING_SETTINGS = {
+    "level": "INFO",
+    # Keep every Nth event per category (1 keeps all, 0 drops all)
+    "sample_every": {"frame": 100, "static": 0, "screenshot": 100, "access": 100, "request": 10},
+    # Maximum events per second per category after sampling
+    "rate_limits": {"frame": 5, "static": 5, "screenshot": 5, "access": 5, "request": 5},
+    # Seconds between aggregated per-category summaries
+    "summary_interval": 60,
+    # Staff IDs whose events are always logged, including DEBUG detail
+    "debug_staff_ids": []
+}
+
+class HotPathLogFilter(logging.Filter):
+    """Samples and rate limits high-volume log categories
+    
+    Hot-path events pass extra={"category": ...} (and "staff_id" where it
+    applies). Records without a category pass unchanged. Counts of seen and
+    suppressed events are kept for periodic summaries.
+    """
+    def __init__(self, settings=None):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.seen = {}
+        self.suppressed = {}
+        self.buckets = {}  # category -> [tokens, last refill time]
+        self.configure(settings or DEFAULT_LOGGING_SETTINGS)
+    
+    def configure(self, settings):
+        """Apply new settings (safe to call while logging)"""
+        merged = dict(DEFAULT_LOGGING_SETTINGS, **settings)
+        self.level = logging.getLevelName(str(merged["level"]).upper())
+        if not isinstance(self.level, int):
+            self.level = logging.INFO
+        self.sample_every = dict(DEFAULT_LOGGING_SETTINGS["sample_every"], **merged["sample_every"])
+        self.rate_limits = dict(DEFAULT_LOGGING_SETTINGS["rate_limits"], **merged["rate_limits"])
+        self.summary_interval = merged["summary_interval"]
+        self.debug_staff_ids = set(merged["debug_staff_ids"])
+    
+    def filter(self, record):
+        # Per-staff debugging bypasses levels, sampling and rate limits
+        if self.debug_staff_ids and getattr(record, "staff_id", None) in self.debug_staff_ids:
+            return True
+        if record.levelno < self.level:
+            return False
+        
+        category = getattr(record, "category", None)
+        if category is None or record.levelno >= logging.WARNING:
+            return True
+        
+        with self.lock:
+            seen = self.seen.get(category, 0) + 1
+            self.seen[category] = seen
+            
+            every = self.sample_every.get(category, 1)
+            if every == 1:
+                keep = True
+            elif every <= 0:
+                keep = False
+            else:
+                keep = seen % every == 0
+            
+            limit = self.rate_limits.get(category)
+            if keep and limit:
+                now = time.monotonic()
+                tokens, last = self.buckets.get(category, (limit, now))
+                tokens = min(limit, tokens + (now - last) * limit)
+                keep = tokens >= 1
+                self.buckets[category] = (tokens - 1 if keep else tokens, now)
+            
+            if not keep:
+                self.suppressed[category] = self.suppressed.get(category, 0) + 1
+        return keep
+    
+    def take_counts(self):
+        """Get and reset (seen, suppressed) counts per category"""
+        with self.lock:
+            counts = {category: (seen, self.suppressed.get(category, 0)) for category, seen in self.seen.items()}
+            self.seen = {}
+            self.suppressed = {}
+        return counts
+
+class LoggingMaintenanceThread(threading.Thread):
+    """Emits periodic log summaries and reloads logging settings from config"""
+    def __init__(self, log_filter, config_path="admin_config.json", reload_interval=5):
+        threading.Thread.__init__(self)
+        self.log_filter = log_filter
+        self.config_path = config_path
+        self.reload_interval = reload_interval
+        self.config_mtime = None
+        self.daemon = True
+        self.stopped = threading.Event()
+    
+    def run(self):
+        last_summary = time.monotonic()
+        while not self.stopped.wait(self.reload_interval):
+            self.reload_settings()
+            if time.monotonic() - last_summary >= self.log_filter.summary_interval:
+                last_summary = time.monotonic()
+                self.log_summary()
+    
+    def reload_settings(self):
+        """Re-read the logging section of the config file when it changes"""
+        try:
+            mtime = os.path.getmtime(self.config_path)
+            if mtime == self.config_mtime:
+                return
+            with open(self.config_path, "r") as f:
+                settings = json.load(f).get("logging", {})
+            self.log_filter.configure(settings)
+            if self.config_mtime is not None:
+                logger.info("Logging settings reloaded")
+            self.config_mtime = mtime
+        except Exception as e:
+            logger.error(f"Error reloading logging settings: {e}")
+    
+    def log_summary(self):
+        """Log one aggregated line for the sampled categories"""
+        counts = self.log_filter.take_counts()
+        if counts:
+            summary = ", ".join(f"{category}={seen} ({suppressed} suppressed)"
+                                for category, (seen, suppressed) in sorted(counts.items()))
+            logger.info(f"Log summary for last {self.log_filter.summary_interval}s: {summary}")
+    
+    def stop(self):
+        self.stopped.set()
+
+log_filter = HotPathLogFilter()
+log_listener = None
+
+def setup_logging(settings=None):
+    """Move log output off the ingest loop and HTTP thread
+    
+    Handlers attached by basicConfig are moved behind a QueueListener thread;
+    callers only enqueue records that pass the hot-path filter.
+    """
+    global log_listener
+    if log_listener:
+        return
+    log_filter.configure(settings or {})
+    
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+    
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(log_filter)
+    root.addHandler(queue_handler)
+    # The filter decides levels so per-staff DEBUG detail can get through
+    root.setLevel(logging.DEBUG)
+    logging.getLogger('websockets').setLevel(logging.INFO)
+    logging.getLogger('PIL').setLevel(logging.INFO)
+    
+    log_listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    
+    maintenance = LoggingMaintenanceThread(log_filter)
+    maintenance.start()
+
 # Load configuration at the top of the file
 config = None  # Initialize config variable
 
@@ -69,6 +245,862 @@ def ensure_directories(base_dir, staff_id):
     os.makedirs(staff_dir, exist_ok=True)
     return staff_dir
 
+# Sprite sheet settings
+SPRITE_CACHE_SIZE = 32  # Number of sheets kept in memory
+SPRITE_MAX_FRAMES = 200
+SPRITE_MAX_COLUMNS = 20
+sprite_cache = OrderedDict()
+sprite_cache_lock = threading.Lock()
+
+def local_time(value):
+    """Convert a timezone-aware datetime to naive local time, as frame names use"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+class FrameIndex:
+    """Time-ordered index of every staff member's frames
+    
+    Frames are named {staff_id}-YYYYMMDD-HHMMSS.jpg, so the index only keeps
+    the seconds since midnight per staff member and day in a compact
+    array('I') (4 bytes per frame) and rebuilds filenames on the way out.
+    A staff member's days are loaded from a directory listing on first use
+    and merged with what ingest added meanwhile. Days past retention_days
+    are dropped when the date rolls over.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.days = {}  # staff_id -> {"YYYYMMDD": array of seconds since midnight}
+        self.loaded = set()  # Staff members whose directory listing is merged in
+        self.current_day = datetime.now().strftime("%Y%m%d")
+    
+    def load(self, staff_id):
+        """(Re)build a staff member's index from the filenames on disk
+        
+        Frames that ingest added while the directory was being listed are
+        kept. Staff members without a directory are not indexed.
+        """
+        staff_dir = os.path.join(config["screenshots_dir"], staff_id)
+        if not os.path.isdir(staff_dir):
+            with self.lock:
+                self.days.pop(staff_id, None)
+                self.loaded.discard(staff_id)
+            return {}
+        
+        cutoff = self.cutoff_day()
+        days = {}
+        for filename in os.listdir(staff_dir):
+            timestamp = parse_frame_timestamp(staff_id, filename)
+            if timestamp is None or filename != self.filename(staff_id, timestamp):
+                continue
+            day = timestamp.strftime("%Y%m%d")
+            if day >= cutoff:
+                days.setdefault(day, set()).add(timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second)
+        with self.lock:
+            for day, frames in self.days.get(staff_id, {}).items():
+                days.setdefault(day, set()).update(frames)
+            days = {day: array('I', sorted(seconds)) for day, seconds in days.items()}
+            self.days[staff_id] = days
+            self.loaded.add(staff_id)
+        return days
+    
+    def load_all(self):
+        """Warm the index for every staff directory"""
+        screenshots_dir = config["screenshots_dir"]
+        for staff_id in os.listdir(screenshots_dir):
+            if not staff_id.startswith('.') and os.path.isdir(os.path.join(screenshots_dir, staff_id)):
+                self._staff_days(staff_id)
+        logger.info(f"Frame index loaded for {len(self.loaded)} staff members")
+    
+    def add(self, staff_id, filename):
+        """Record a frame stored by ingest"""
+        timestamp = parse_frame_timestamp(staff_id, filename)
+        if timestamp is None or filename != self.filename(staff_id, timestamp):
+            return
+        day = timestamp.strftime("%Y%m%d")
+        seconds = timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second
+        if day > self.current_day:
+            self.current_day = day
+            self.prune()
+        with self.lock:
+            # Kept even before the first load, which merges the listing into it
+            frames = self.days.setdefault(staff_id, {}).setdefault(day, array('I'))
+            # Frames normally arrive in order, so this is an append
+            position = bisect.bisect_left(frames, seconds)
+            if position == len(frames) or frames[position] != seconds:
+                frames.insert(position, seconds)
+    
+    def prune(self):
+        """Drop days past the retention period"""
+        cutoff = self.cutoff_day()
+        with self.lock:
+            for days in self.days.values():
+                for day in [day for day in days if day < cutoff]:
+                    del days[day]
+    
+    @staticmethod
+    def cutoff_day():
+        """Get the oldest day (YYYYMMDD) still within retention_days"""
+        return (datetime.now() - timedelta(days=config.get("retention_days", 30))).strftime("%Y%m%d")
+    
+    def nearest(self, staff_id, at, tolerance):
+        """Get the (timestamp, filename) closest to at within tolerance seconds, or None"""
+        at = local_time(at)
+        days = self._staff_days(staff_id)
+        best = None
+        day = (at - timedelta(seconds=tolerance)).date()
+        while day <= (at + timedelta(seconds=tolerance)).date():
+            midnight = datetime.combine(day, datetime.min.time())
+            target = (at - midnight).total_seconds()
+            with self.lock:
+                frames = days.get(day.strftime("%Y%m%d"))
+                candidates = []
+                if frames:
+                    position = bisect.bisect_left(frames, target)
+                    candidates = frames[max(0, position - 1):position + 1]
+            for seconds in candidates:
+                distance = abs(seconds - target)
+                if distance <= tolerance and (best is None or distance < best[0]):
+                    best = (distance, midnight + timedelta(seconds=seconds))
+            day += timedelta(days=1)
+        
+        if best is None:
+            return None
+        return best[1], self.filename(staff_id, best[1])
+    
+    def range(self, staff_id, start=None, end=None):
+        """List (timestamp, filename) tuples between start and end, oldest first"""
+        start, end = local_time(start), local_time(end)
+        days = self._staff_days(staff_id)
+        with self.lock:
+            day_keys = sorted(days)
+        frames = []
+        for day in day_keys:
+            if (start and day < start.strftime("%Y%m%d")) or (end and day > end.strftime("%Y%m%d")):
+                continue
+            midnight = datetime.strptime(day, "%Y%m%d")
+            low = (start - midnight).total_seconds() if start else 0
+            high = (end - midnight).total_seconds() if end else 86400
+            with self.lock:
+                seconds_list = days.get(day)
+                if seconds_list is None:
+                    continue  # Pruned meanwhile
+                selected = seconds_list[bisect.bisect_left(seconds_list, low):bisect.bisect_right(seconds_list, high)]
+            for seconds in selected:
+                timestamp = midnight + timedelta(seconds=seconds)
+                frames.append((timestamp, self.filename(staff_id, timestamp)))
+        return frames
+    
+    def forget(self, staff_id):
+        """Drop a staff member's index so it is rebuilt from disk"""
+        with self.lock:
+            self.days.pop(staff_id, None)
+            self.loaded.discard(staff_id)
+    
+    def _staff_days(self, staff_id):
+        with self.lock:
+            if staff_id in self.loaded:
+                return self.days[staff_id]
+        return self.load(staff_id)
+    
+    @staticmethod
+    def filename(staff_id, timestamp):
+        return f"{staff_id}-{timestamp.strftime('%Y%m%d-%H%M%S')}.jpg"
+
+frame_index = FrameIndex()
+
+def list_staff_frames(staff_id, start=None, end=None):
+    """List a staff member's frames as (timestamp, filename) tuples, oldest first"""
+    return frame_index.range(staff_id, start, end)
+
+def sample_frames(frames, count):
+    """Pick up to count frames evenly spread across the list"""
+    if len(frames) <= count:
+        return frames
+    step = len(frames) / count
+    return [frames[int(i * step)] for i in range(count)]
+
+def get_sprite_sheet(staff_id, start, end, count=50, tile_width=160, columns=10):
+    """Build (or fetch from cache) a sprite sheet of downscaled frames
+    
+    Args:
+        staff_id (str): ID of the staff member
+        start (datetime): Start of the time window
+        end (datetime): End of the time window
+        count (int): Maximum number of frames in the sheet
+        tile_width (int): Width of each tile in pixels
+        columns (int): Number of tiles per row
+    
+    Returns:
+        tuple: (key, jpeg bytes, offset map) or (None, None, offset map) if there are no frames
+    """
+    selected = sample_frames(list_staff_frames(staff_id, start, end), count)
+    columns = max(1, min(columns, len(selected) or 1))
+    
+    # The key covers the exact frames used, so a cached sheet is never stale
+    digest = hashlib.sha1(f"{staff_id}|{tile_width}|{columns}".encode())
+    for _, filename in selected:
+        digest.update(filename.encode())
+    key = digest.hexdigest()
+    
+    with sprite_cache_lock:
+        if key in sprite_cache:
+            sprite_cache.move_to_end(key)
+            return sprite_cache[key]
+    
+    offset_map = {
+        "staffId": staff_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "tileWidth": tile_width,
+        "tileHeight": 0,
+        "columns": columns,
+        "rows": 0,
+        "frames": []
+    }
+    if not selected:
+        return None, None, offset_map
+    
+    # Sheets for closed hours never change, so they are also kept on disk
+    cache_dir = os.path.join(config["screenshots_dir"], ".cache", "sprites")
+    cache_image = os.path.join(cache_dir, f"{key}.jpg")
+    cache_map = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(cache_image) and os.path.exists(cache_map):
+        try:
+            with open(cache_image, "rb") as f:
+                sheet_bytes = f.read()
+            with open(cache_map, "r") as f:
+                offset_map = json.load(f)
+            result = (key, sheet_bytes, offset_map)
+            _remember_sprite_sheet(key, result)
+            return result
+        except Exception as e:
+            logger.error(f"Error reading cached sprite sheet {key}: {e}")
+    
+    staff_dir = os.path.join(config["screenshots_dir"], staff_id)
+    tile_height = None
+    tiles = []
+    for timestamp, filename in selected:
+        try:
+            with Image.open(os.path.join(staff_dir, filename)) as img:
+                if tile_height is None:
+                    tile_height = max(1, round(tile_width * img.height / img.width))
+                # Let the JPEG decoder downscale while decoding
+                img.draft("RGB", (tile_width, tile_height))
+                img = img.convert("RGB")
+                img.thumbnail((tile_width, tile_height))
+                tiles.append((timestamp, filename, img))
+        except Exception as e:
+            logger.warning(f"Skipping unreadable frame {filename}: {e}")
+    
+    if not tiles:
+        return None, None, offset_map
+    
+    rows = math.ceil(len(tiles) / columns)
+    sheet = Image.new("RGB", (tile_width * columns, tile_height * rows))
+    for index, (timestamp, filename, img) in enumerate(tiles):
+        x = (index % columns) * tile_width
+        y = (index // columns) * tile_height
+        sheet.paste(img, (x + (tile_width - img.width) // 2, y + (tile_height - img.height) // 2))
+        offset_map["frames"].append({
+            "index": index,
+            "filename": filename,
+            "path": f"screenshots/{staff_id}/{filename}",
+            "timestamp": timestamp.isoformat(),
+            "x": x,
+            "y": y
+        })
+    
+    offset_map["tileHeight"] = tile_height
+    offset_map["rows"] = rows
+    
+    buffer = BytesIO()
+    sheet.save(buffer, format="JPEG", quality=60, optimize=True)
+    sheet_bytes = buffer.getvalue()
+    result = (key, sheet_bytes, offset_map)
+    _remember_sprite_sheet(key, result)
+    
+    current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+    if end <= current_hour:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_image, "wb") as f:
+                f.write(sheet_bytes)
+            with open(cache_map, "w") as f:
+                json.dump(offset_map, f)
+        except Exception as e:
+            logger.error(f"Error caching sprite sheet {key}: {e}")
+    
+    return result
+
+def _remember_sprite_sheet(key, result):
+    """Keep a sprite sheet in the in-memory LRU cache"""
+    with sprite_cache_lock:
+        sprite_cache[key] = result
+        sprite_cache.move_to_end(key)
+        while len(sprite_cache) > SPRITE_CACHE_SIZE:
+            sprite_cache.popitem(last=False)
+
+# Versioned staff list state for delta polling
+# Dashboard order: active, idle, inactive, then by name
+STATUS_RANK = {"active": 0, "idle": 1}
+
+STAFF_SORT_KEYS = {
+    "status": lambda entry: (STATUS_RANK.get(entry["recording_status"], 2), entry["name"]),
+    "name": lambda entry: (entry["name"].lower(),),
+    "division": lambda entry: (entry["division"], entry["name"]),
+    "last_activity": lambda entry: (entry["timestamp"] or "",)
+}
+
+class StaffIndex:
+    """In-memory indexes over staff list entries for filtered, paged queries
+    
+    Keeps one sorted list of (sort key, staff_id) per STAFF_SORT_KEYS entry,
+    staff ID sets per division and per status, per-division status counts
+    and a count of staff members per display name. Entries are added and removed one at a time as staff state
+    changes, so no query sorts. Not thread-safe; StaffListState holds its
+    lock around every call.
+    """
+    def __init__(self):
+        self.rebuild({})
+    
+    def rebuild(self, entries):
+        self.sorted = {sort: [] for sort in STAFF_SORT_KEYS}
+        self.by_division = {}
+        self.by_status = {}
+        self.counts = {}  # division -> {status: count}
+        self.name_counts = {}  # name -> number of staff members with it
+        for staff_id, entry in entries.items():
+            self._add_to_sets(staff_id, entry)
+            for sort, key in STAFF_SORT_KEYS.items():
+                self.sorted[sort].append((key(entry), staff_id))
+        for items in self.sorted.values():
+            items.sort()
+    
+    def add(self, staff_id, entry):
+        self._add_to_sets(staff_id, entry)
+        for sort, key in STAFF_SORT_KEYS.items():
+            bisect.insort(self.sorted[sort], (key(entry), staff_id))
+    
+    def remove(self, staff_id, entry):
+        division, status = entry["division"], entry["recording_status"]
+        self.by_division[division].discard(staff_id)
+        self.by_status[status].discard(staff_id)
+        self.counts[division][status] -= 1
+        self.name_counts[entry["name"]] -= 1
+        if not self.name_counts[entry["name"]]:
+            del self.name_counts[entry["name"]]
+        if not self.by_division[division]:
+            del self.by_division[division]
+            del self.counts[division]
+        for sort, key in STAFF_SORT_KEYS.items():
+            items = self.sorted[sort]
+            position = bisect.bisect_left(items, (key(entry), staff_id))
+            if position < len(items) and items[position][1] == staff_id:
+                del items[position]
+    
+    def _add_to_sets(self, staff_id, entry):
+        division, status = entry["division"], entry["recording_status"]
+        self.by_division.setdefault(division, set()).add(staff_id)
+        self.by_status.setdefault(status, set()).add(staff_id)
+        division_counts = self.counts.setdefault(division, {})
+        division_counts[status] = division_counts.get(status, 0) + 1
+        self.name_counts[entry["name"]] = self.name_counts.get(entry["name"], 0) + 1
+    
+    def order(self):
+        """Get every staff ID in dashboard order"""
+        return [staff_id for _, staff_id in self.sorted["status"]]
+    
+    def query(self, division=None, status=None, name_prefix=None, sort="status", descending=False, offset=0, limit=50):
+        """Get (staff IDs for the page, total matches)
+        
+        Filters intersect the division and status sets and a name prefix
+        range of the name index; the page is then read off the requested
+        sort index, stopping once it is full.
+        """
+        candidates = None
+        for ids_by_value, value in ((self.by_division, division), (self.by_status, status)):
+            if value:
+                ids = ids_by_value.get(value, set())
+                candidates = ids if candidates is None else candidates & ids
+        if name_prefix:
+            names = self.sorted["name"]
+            prefix = name_prefix.lower()
+            low = bisect.bisect_left(names, ((prefix,),))
+            high = bisect.bisect_left(names, ((prefix + "\uffff",),))
+            ids = {staff_id for _, staff_id in names[low:high]}
+            candidates = ids if candidates is None else candidates & ids
+        
+        items = self.sorted[sort]
+        if candidates is None:
+            if descending:
+                items = items[::-1]
+            return [staff_id for _, staff_id in items[offset:offset + limit]], len(items)
+        
+        page = []
+        skipped = 0
+        for _, staff_id in (reversed(items) if descending else items):
+            if staff_id not in candidates:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            page.append(staff_id)
+            if len(page) >= limit:
+                break
+        return page, len(candidates)
+    
+    def division_counts(self):
+        """Get {division: {"total", "active", "idle", "inactive"}}"""
+        return {
+            division: dict({"active": 0, "idle": 0, "inactive": 0}, total=sum(counts.values()), **counts)
+            for division, counts in sorted(self.counts.items())
+        }
+    
+    def names(self):
+        """Get every staff member's display name, sorted"""
+        return sorted(self.name_counts, key=str.lower)
+
+class StaffListState:
+    """Keeps a monotonic version of the staff list and recent snapshots
+    
+    handle_client and presence transitions call bump() on every staff state
+    change. Snapshots are updated lazily when the version moved: only the
+    staff members bumped since the last snapshot are re-read, outside the
+    lock bump() takes, and the StaffIndex is updated entry by entry. A full rebuild still runs
+    periodically so that changes made on disk by other processes also
+    produce a new version.
+    """
+    def __init__(self, history_size=32, refresh_interval=30):
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()  # Serializes snapshot rebuilds; bump() never takes it
+        self.epoch = str(int(time.time()))  # Distinguishes tokens across restarts
+        self.version = 0
+        self.dirty = True
+        self.last_refresh = 0
+        self.history_size = history_size
+        self.refresh_interval = refresh_interval
+        self.order = []
+        self.entries = {}
+        self.history = OrderedDict()  # version -> entries
+        self.staff_versions = {}  # staff_id -> version of its last change
+        self.dirty_ids = set()  # Staff members changed since the last snapshot
+        self.index = StaffIndex()
+    
+    def bump(self, staff_id=None):
+        """Record a staff state change (for everyone when staff_id is None)"""
+        with self.lock:
+            self.version += 1
+            self.dirty = True
+            if staff_id:
+                self.staff_versions[staff_id] = self.version
+                self.dirty_ids.add(staff_id)
+            else:
+                self.last_refresh = 0
+    
+    def staff_version(self, staff_id):
+        """Get the version of a staff member's last change"""
+        with self.lock:
+            return self.staff_versions.get(staff_id, 0)
+    
+    def token(self, version=None):
+        """Get the opaque version token handed to clients"""
+        return f"{self.epoch}.{self.version if version is None else version}"
+    
+    def parse_token(self, token):
+        """Get the version for a token from this server run, or None"""
+        epoch, _, version = (token or "").partition(".")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
+    
+    def snapshot(self):
+        """Get (version, order, entries) for the current staff list
+        
+        Disk reads happen outside self.lock, which bump() takes on the event
+        loop; refresh_lock only keeps two rebuilds from interleaving.
+        """
+        with self.refresh_lock:
+            with self.lock:
+                stale = time.time() - self.last_refresh > self.refresh_interval
+                if not self.dirty and not stale:
+                    return self.version, self.order, self.entries
+                self.dirty = False
+                dirty_ids, self.dirty_ids = self.dirty_ids, set()
+                if stale:
+                    self.last_refresh = time.time()
+            
+            if stale:
+                rebuilt = {staff["staff_id"]: staff_list_entry(staff) for staff in get_staff_list()}
+            else:
+                # Re-read only the staff members that changed
+                changed = {staff_id: get_staff_info(config["screenshots_dir"], staff_id) for staff_id in dirty_ids}
+            
+            with self.lock:
+                if stale:
+                    entries = rebuilt
+                    self.index.rebuild(entries)
+                else:
+                    entries = dict(self.entries)
+                    for staff_id, staff in changed.items():
+                        old_entry = entries.pop(staff_id, None)
+                        if old_entry:
+                            self.index.remove(staff_id, old_entry)
+                        if staff:
+                            entries[staff_id] = staff_list_entry(staff)
+                            self.index.add(staff_id, entries[staff_id])
+                order = self.index.order()
+                
+                if entries != self.entries or order != self.order:
+                    # Periodic refreshes that find changes get a version of their own
+                    if self.version in self.history:
+                        self.version += 1
+                    self.order = order
+                    self.entries = entries
+                
+                self.history[self.version] = self.entries
+                while len(self.history) > self.history_size:
+                    self.history.popitem(last=False)
+                return self.version, self.order, self.entries
+    
+    def query(self, division=None, status=None, name_prefix=None, sort="status", descending=False, page=1, page_size=50):
+        """Get one page of the filtered and sorted staff list
+        
+        Returns:
+            dict: version, page staff IDs and entries, total matches, per-division counts and all names
+        """
+        self.snapshot()
+        with self.lock:
+            # Read the version and entries the index currently matches
+            version, entries = self.version, self.entries
+            staff_ids, total = self.index.query(division, status, name_prefix, sort, descending,
+                                                (page - 1) * page_size, page_size)
+            divisions = self.index.division_counts()
+            names = self.index.names()
+            statuses = {status: len(ids) for status, ids in self.index.by_status.items()}
+        return {
+            "version": version,
+            "staffList": staff_ids,
+            "staffData": {staff_id: entries[staff_id] for staff_id in staff_ids if staff_id in entries},
+            "total": total,
+            "divisions": divisions,
+            "names": names,
+            "statusCounts": dict({"active": 0, "idle": 0, "inactive": 0}, **statuses)
+        }
+    
+    def delta(self, since_version):
+        """Get (version, delta) since an earlier version, or (version, None) if unknown"""
+        version, order, entries = self.snapshot()
+        with self.lock:
+            previous = self.history.get(since_version)
+        if previous is None:
+            return version, None
+        
+        delta = {"added": {}, "changed": {}, "removed": []}
+        for staff_id, entry in entries.items():
+            if staff_id not in previous:
+                delta["added"][staff_id] = entry
+            elif previous[staff_id] != entry:
+                delta["changed"][staff_id] = entry
+        delta["removed"] = [staff_id for staff_id in previous if staff_id not in entries]
+        return version, delta
+
+staff_list_state = StaffListState()
+
+# Any of these switches /api/staff-list to filtered, paged responses
+STAFF_LIST_QUERY_PARAMS = ("division", "status", "name", "sort", "page", "page_size")
+
+# Encoded API response cache
+class ResponseCache:
+    """Memoizes JSON API responses as encoded and gzip-compressed bytes
+    
+    Entries are keyed by request and tagged with the data version they were
+    built from, so a staff state change invalidates them on the next lookup.
+    max_age bounds staleness for changes made outside this process (e.g. the
+    cleanup script removing old frames).
+    """
+    def __init__(self, max_entries=256, min_compress_size=512, max_age=60):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.min_compress_size = min_compress_size
+        self.entries = OrderedDict()  # key -> entry dict
+        self.hits = {}
+        self.misses = {}
+    
+    def get(self, key, version, build):
+        """Get the cached entry for key at version, building it on a miss
+        
+        Args:
+            key (tuple): Cache key, the first item names the endpoint
+            version: Data version the response must match
+            build (callable): Returns the response data on a miss
+        
+        Returns:
+            dict: Entry with body, gzip body (or None) and etag
+        """
+        endpoint = key[0]
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry["version"] == version and time.time() - entry["created"] < self.max_age:
+                self.entries.move_to_end(key)
+                self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+                return entry
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+        
+        entry = self.encode(build(), version)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+    
+    def encode(self, data, version=None):
+        """Serialize data once into plain and (when worthwhile) gzip bytes"""
+        body = json.dumps(data, separators=(',', ':')).encode()
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= self.min_compress_size else None
+        return {
+            "version": version,
+            "body": body,
+            "gzip": compressed,
+            "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+            "created": time.time()
+        }
+    
+    def stats(self):
+        """Get hit and miss counts per endpoint"""
+        with self.lock:
+            endpoints = {}
+            for endpoint in set(self.hits) | set(self.misses):
+                hits = self.hits.get(endpoint, 0)
+                misses = self.misses.get(endpoint, 0)
+                endpoints[endpoint] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hitRate": round(hits / (hits + misses), 3)
+                }
+            total_hits = sum(self.hits.values())
+            total_misses = sum(self.misses.values())
+            return {
+                "entries": len(self.entries),
+                "hits": total_hits,
+                "misses": total_misses,
+                "hitRate": round(total_hits / (total_hits + total_misses), 3) if total_hits + total_misses else 0,
+                "endpoints": endpoints
+            }
+
+response_cache = ResponseCache()
+
+def accepts_encoding(header, coding):
+    """Check an Accept-Encoding header for a content coding with a non-zero q-value"""
+    wildcard = None
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        name = name.strip().lower()
+        if name == coding:
+            return quality > 0
+        if name == "*":
+            wildcard = quality > 0
+    return bool(wildcard)
+
+# Server-composited staff wall mosaic
+# TrueType fonts tried for tile labels before Pillow's default font
+LABEL_FONTS = ("DejaVuSans.ttf", "Arial.ttf", "arial.ttf", "LiberationSans-Regular.ttf")
+LABEL_FALLBACK_CHARS = str.maketrans("ıİşŞğĞ", "iIsSgG")
+_label_font = None
+
+def mosaic_label_font():
+    """Get the font for mosaic tile labels, loading it on first use"""
+    global _label_font
+    if _label_font is None:
+        for name in LABEL_FONTS:
+            try:
+                _label_font = ImageFont.truetype(name, 12)
+                break
+            except OSError:
+                continue
+        else:
+            _label_font = ImageFont.load_default()
+    return _label_font
+
+MOSAIC_TILE_WIDTHS = (160, 240, 320, 480, 640)  # Tile widths are snapped to these
+
+class MosaicBuilder:
+    """Composites every staff member's latest frame into one wall image
+    
+    Downscaled tiles are cached per staff member and tile width and only
+    rebuilt when the source latest.jpg changes (new inode, size or mtime).
+    Tile widths snap to MOSAIC_TILE_WIDTHS, so the cache holds at most one
+    tile per staff member and width. The encoded mosaic is cached until any
+    of its tiles change.
+    """
+    def __init__(self, max_mosaics=8):
+        self.lock = threading.Lock()
+        self.tiles = {}  # (staff_id, tile_width) -> (signature, Image)
+        self.mosaics = OrderedDict()  # request key -> (signature, etag, jpeg bytes)
+        self.max_mosaics = max_mosaics
+        self.tiles_rebuilt = 0
+        self.tiles_reused = 0
+    
+    def build(self, division=None, tile_width=320, columns=None):
+        """Get (etag, jpeg bytes) for the wall, or (None, None) if nobody matches"""
+        _, order, entries = staff_list_state.snapshot()
+        staff_ids = [staff_id for staff_id in order
+                     if not division or division == "all" or entries[staff_id]["division"] == division]
+        if not staff_ids:
+            return None, None
+        
+        tile_width = min(MOSAIC_TILE_WIDTHS, key=lambda width: abs(width - tile_width))
+        tile_height = round(tile_width * 9 / 16)
+        columns = columns or math.ceil(math.sqrt(len(staff_ids)))
+        
+        with self.lock:
+            sources = []
+            for staff_id in staff_ids:
+                entry = entries[staff_id]
+                path = os.path.join(config["screenshots_dir"], staff_id, "latest.jpg")
+                try:
+                    stat = os.stat(path)
+                    source = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    source = None
+                sources.append((staff_id, path, (source, entry["name"], entry["recording_status"])))
+            
+            key = (division, tile_width, columns)
+            signature = tuple(sources)
+            cached = self.mosaics.get(key)
+            if cached and cached[0] == signature:
+                self.mosaics.move_to_end(key)
+                return cached[1], cached[2]
+            
+            rows = math.ceil(len(sources) / columns)
+            mosaic = Image.new("RGB", (tile_width * columns, tile_height * rows), (17, 17, 17))
+            for index, (staff_id, path, tile_signature) in enumerate(sources):
+                tile = self._tile(staff_id, path, tile_signature, entries[staff_id], tile_width, tile_height)
+                mosaic.paste(tile, ((index % columns) * tile_width, (index // columns) * tile_height))
+            
+            buffer = BytesIO()
+            mosaic.save(buffer, format="JPEG", quality=70)
+            mosaic_bytes = buffer.getvalue()
+            etag = '"' + hashlib.sha1(mosaic_bytes).hexdigest() + '"'
+            
+            self.mosaics[key] = (signature, etag, mosaic_bytes)
+            while len(self.mosaics) > self.max_mosaics:
+                self.mosaics.popitem(last=False)
+            
+            # Forget tiles of staff members who left the directory; other walls keep theirs
+            for tile_key in [k for k in self.tiles if k[0] not in entries]:
+                del self.tiles[tile_key]
+            return etag, mosaic_bytes
+    
+    def _tile(self, staff_id, path, signature, entry, tile_width, tile_height):
+        """Get a staff member's tile, rebuilding it only if its source changed"""
+        cached = self.tiles.get((staff_id, tile_width))
+        if cached and cached[0] == signature:
+            self.tiles_reused += 1
+            return cached[1]
+        
+        tile = Image.new("RGB", (tile_width, tile_height), (17, 17, 17))
+        if signature[0] is not None:
+            try:
+                with Image.open(path) as img:
+                    img.draft("RGB", (tile_width, tile_height))
+                    img = img.convert("RGB")
+                    img.thumbnail((tile_width, tile_height))
+                    tile.paste(img, ((tile_width - img.width) // 2, (tile_height - img.height) // 2))
+            except Exception as e:
+                logger.warning(f"Could not read latest frame for {staff_id}: {e}")
+        
+        # Name label with a status colour bar
+        draw = ImageDraw.Draw(tile)
+        status_colors = {"active": (46, 204, 113), "idle": (243, 156, 18)}
+        draw.rectangle((0, tile_height - 18, tile_width, tile_height), fill=(0, 0, 0))
+        draw.rectangle((0, tile_height - 18, 4, tile_height), fill=status_colors.get(entry["recording_status"], (231, 76, 60)))
+        try:
+            draw.text((8, tile_height - 15), entry["name"], font=mosaic_label_font(), fill=(238, 238, 238))
+        except UnicodeEncodeError:
+            # Bitmap fonts of older Pillow versions only cover Latin-1
+            label = entry["name"].translate(LABEL_FALLBACK_CHARS).encode("latin-1", "replace").decode("latin-1")
+            draw.text((8, tile_height - 15), label, fill=(238, 238, 238))
+        
+        self.tiles[(staff_id, tile_width)] = (signature, tile)
+        self.tiles_rebuilt += 1
+        return tile
+    
+    def stats(self):
+        with self.lock:
+            return {
+                "tiles": len(self.tiles),
+                "tilesRebuilt": self.tiles_rebuilt,
+                "tilesReused": self.tiles_reused,
+                "mosaics": len(self.mosaics)
+            }
+
+mosaic_builder = MosaicBuilder()
+
+# Live frame fan-out for streaming viewers
+class FrameBroadcaster:
+    """Fans out incoming frames to live viewers without decoding them
+    
+    Each viewer gets a small bounded queue. When a viewer falls behind, the
+    oldest queued frame is dropped so it always catches up to the newest one.
+    """
+    def __init__(self, queue_size=2):
+        self.lock = threading.Lock()
+        self.queue_size = queue_size
+        self.viewers = {}  # staff_id -> set of queues
+        self.dropped = 0
+    
+    def subscribe(self, staff_id):
+        viewer = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            self.viewers.setdefault(staff_id, set()).add(viewer)
+        return viewer
+    
+    def unsubscribe(self, staff_id, viewer):
+        with self.lock:
+            viewers = self.viewers.get(staff_id)
+            if viewers:
+                viewers.discard(viewer)
+                if not viewers:
+                    del self.viewers[staff_id]
+    
+    def publish(self, staff_id, frame):
+        """Queue a frame for every viewer of staff_id (never blocks)"""
+        with self.lock:
+            viewers = list(self.viewers.get(staff_id, ()))
+        for viewer in viewers:
+            while True:
+                try:
+                    viewer.put_nowait(frame)
+                    break
+                except queue.Full:
+                    try:
+                        viewer.get_nowait()
+                    except queue.Empty:
+                        continue
+                    # stats() reads the counter from HTTP server threads
+                    with self.lock:
+                        self.dropped += 1
+    
+    def stats(self):
+        with self.lock:
+            return {
+                "viewers": {staff_id: len(viewers) for staff_id, viewers in self.viewers.items()},
+                "dropped": self.dropped
+            }
+
+broadcaster = FrameBroadcaster()
+
 # HTTP server handler
 class HTTPHandler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -94,7 +1126,7 @@ class HTTPHandler(BaseHTTPRequestHandler):
                 clean_path = parsed_url.path[1:]  # Remove leading slash
                 file_path = os.path.join(os.getcwd(), clean_path)
                 
-                logger.info(f"Request for CSS file: {self.path}, serving from: {file_path}")
+                logger.info("Request for CSS file: %s", self.path, extra={"category": "static"})
                 
                 if os.path.exists(file_path) and os.path.isfile(file_path):
                     self.send_response(200)
@@ -105,7 +1137,6 @@ class HTTPHandler(BaseHTTPRequestHandler):
                     try:
                         with open(file_path, 'rb') as f:
                             self.wfile.write(f.read())
-                            logger.info(f"Successfully served CSS file: {file_path}")
                     except Exception as e:
                         logger.error(f"Error reading CSS file {file_path}: {e}")
                         self.wfile.write(b"Error reading file")
@@ -123,7 +1154,7 @@ class HTTPHandler(BaseHTTPRequestHandler):
                 clean_path = parsed_url.path[1:]  # Remove leading slash
                 file_path = os.path.join(os.getcwd(), clean_path)
                 
-                logger.info(f"Request for JavaScript file: {self.path}, serving from: {file_path}")
+                logger.info("Request for JavaScript file: %s", self.path, extra={"category": "static"})
                 
                 if os.path.exists(file_path) and os.path.isfile(file_path):
                     self.send_response(200)
@@ -134,7 +1165,6 @@ class HTTPHandler(BaseHTTPRequestHandler):
                     try:
                         with open(file_path, 'rb') as f:
                             self.wfile.write(f.read())
-                            logger.info(f"Successfully served JavaScript file: {file_path}")
                     except Exception as e:
                         logger.error(f"Error reading JavaScript file {file_path}: {e}")
                         self.wfile.write(b"Error reading file")
@@ -152,7 +1182,7 @@ class HTTPHandler(BaseHTTPRequestHandler):
                 clean_path = parsed_url.path[1:]  # Remove leading slash
                 file_path = os.path.join(os.getcwd(), clean_path)
                 
-                logger.info(f"Request for screenshot file: {path}, serving from: {file_path}")
+                logger.info("Request for screenshot file: %s", path, extra={"category": "screenshot"})
                 
                 if os.path.exists(file_path) and os.path.isfile(file_path):
                     self.send_response(200)
@@ -165,7 +1195,6 @@ class HTTPHandler(BaseHTTPRequestHandler):
                     try:
                         with open(file_path, 'rb') as f:
                             self.wfile.write(f.read())
-                        logger.info(f"Successfully served screenshot file: {file_path}")
                     except Exception as e:
                         logger.error(f"Error reading screenshot file {file_path}: {e}")
                     return
@@ -233,7 +1262,7 @@ class HTTPHandler(BaseHTTPRequestHandler):
                 clean_path = parsed_url.path[1:]  # Remove leading slash
                 file_path = os.path.join(os.getcwd(), clean_path)
                 
-                logger.info(f"HEAD request for screenshot file: {path}, checking: {file_path}")
+                logger.info("HEAD request for screenshot file: %s", path, extra={"category": "screenshot"})
                 
                 if os.path.exists(file_path) and os.path.isfile(file_path):
                     self.send_response(200)
@@ -242,7 +1271,6 @@ class HTTPHandler(BaseHTTPRequestHandler):
                     self.send_header('Access-Control-Allow-Origin', '*')
                     self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
                     self.end_headers()
-                    logger.info(f"HEAD request successful for screenshot file: {file_path}")
                 else:
                     logger.warning(f"Screenshot file not found for HEAD request: {file_path}")
                     self.send_response(404)
@@ -261,31 +1289,7 @@ class HTTPHandler(BaseHTTPRequestHandler):
     def handle_api_request(self, path):
         """Handle API endpoints"""
         if path == "/api/staff-list":
-            # Get staff list
-            staff_list = get_staff_list()
-            
-            # Format for the frontend
-            staff_response = {
-                "staffList": [],
-                "staffData": {}
-            }
-            
-            for staff in staff_list:
-                staff_id = staff["staff_id"]
-                staff_response["staffList"].append(staff_id)
-                staff_response["staffData"][staff_id] = {
-                    "name": staff["name"],
-                    "division": staff["division"],
-                    "recording_status": staff["activity_status"],
-                    "timestamp": staff.get("last_activity", datetime.now().isoformat()),
-                    "screenshot_path": staff["screenshot_path"]
-                }
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(staff_response).encode())
+            self.handle_staff_list_request()
         
         elif path == "/api/history" or path.startswith("/api/staff-history/"):
             # Parse query parameters
@@ -305,36 +1309,494 @@ class HTTPHandler(BaseHTTPRequestHandler):
                 staff_id = params.get("staff_id")
             
             if not staff_id:
-                self.send_response(400)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Missing staff_id parameter"}).encode())
+                self.send_json({"error": "Missing staff_id parameter"}, 400)
                 return
             
             # Extract date filter and limit parameters
             date_filter = params.get("date", "all")
             limit = params.get("limit", "20")
+            skip_idle = params.get("skip_idle") in ("1", "true")
             
-            # Get history for the staff member
-            logger.info(f"Fetching history for staff ID: {staff_id}, date filter: {date_filter}, limit: {limit}")
-            history_data = self.get_staff_history(staff_id, date_filter, limit)
+            # History only changes when this staff member's state changes
+            logger.info("Fetching history for staff ID: %s, date filter: %s, limit: %s", staff_id, date_filter, limit,
+                        extra={"category": "request", "staff_id": staff_id})
+            entry = response_cache.get(
+                ("staff-history", staff_id, date_filter, limit, skip_idle),
+                staff_list_state.staff_version(staff_id),
+                lambda: self.get_staff_history(staff_id, date_filter, limit, skip_idle)
+            )
+            self.send_cached_json(entry)
+        
+        elif path == "/api/cache-stats":
+            with sprite_cache_lock:
+                sprite_entries = len(sprite_cache)
+            stats = {
+                "responses": response_cache.stats(),
+                "spriteSheets": {"entries": sprite_entries},
+                "mosaic": mosaic_builder.stats()
+            }
+            self.send_json(stats)
+        
+        elif path == "/api/admission-stats":
+            self.send_json(admission.stats())
+        
+        elif path == "/api/capture-profiles":
+            self.send_json({
+                "override": capture_profiles.settings["override"],
+                "businessHours": capture_profiles.in_business_hours(datetime.now()),
+                "staff": capture_profiles.state()
+            })
+        
+        elif path == "/api/storage-stats":
+            stats = frame_store.stats() if frame_store else {}
+            if compactor:
+                stats["compaction"] = compactor.stats()
+            self.send_json(stats)
+        
+        elif path.startswith("/api/sprite-sheet/"):
+            self.handle_sprite_sheet_request(path)
+        
+        elif path == "/api/activity":
+            self.handle_activity_request()
+        
+        elif path.startswith("/api/sessions/"):
+            staff_id = path[len("/api/sessions/"):].split('/')[0]
+            params = dict(parse_qsl(urlparse(self.path).query))
+            days = params.get("days", "7")
+            days = max(1, min(int(days), 366)) if days.isdigit() else 7
+            self.send_json(journal.sessions_for(staff_id, days))
+        
+        elif path == "/api/uptime":
+            # Connected time per staff member for one day (default today)
+            params = dict(parse_qsl(urlparse(self.path).query))
+            day = params.get("date", datetime.now().strftime("%Y%m%d"))
+            _, order, _ = staff_list_state.snapshot()
+            self.send_json({
+                "date": day,
+                "uptime": {staff_id: journal.connected_seconds(staff_id, day) for staff_id in order}
+            })
+        
+        elif path.startswith("/api/export/"):
+            self.handle_export_request(path[len("/api/export/"):].split('/')[0])
+        
+        elif path == "/api/snapshot":
+            self.handle_snapshot_request()
+        
+        elif path == "/api/mosaic":
+            self.handle_mosaic_request()
+        
+        elif path.startswith("/api/live-stream/"):
+            self.handle_live_stream(path[len("/api/live-stream/"):].split('/')[0])
+        
+        elif path == "/api/stream-stats":
+            self.send_json(broadcaster.stats())
+        
+        else:
+            # Unknown API endpoint
+            logger.warning(f"Unknown API endpoint requested: {path}")
+            self.send_json({"error": "API endpoint not found"}, 404)
+
+    def handle_staff_list_request(self):
+        """Serve the staff list, as a delta when the client sends a since token
+        
+        Full responses carry staffList/staffData; delta responses carry
+        added/changed/removed. Both include a version token to pass back as
+        since on the next poll, and an ETag so unchanged polls get a 304.
+        Requests with any filter or paging parameter get one page instead
+        (handle_staff_page_request), which takes no since token.
+        """
+        params = dict(parse_qsl(urlparse(self.path).query))
+        if any(name in params for name in STAFF_LIST_QUERY_PARAMS):
+            self.handle_staff_page_request(params)
+            return
+        
+        since = staff_list_state.parse_token(params.get("since"))
+        
+        version, order, entries = staff_list_state.snapshot()
+        token = staff_list_state.token(version)
+        etag = f'"{token}"'
+        
+        # Nothing changed since the client's version (or its cached copy)
+        if since == version or self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        
+        entry = None
+        if since is not None:
+            def build_delta():
+                _, delta = staff_list_state.delta(since)
+                return None if delta is None else dict(delta, version=token, full=False)
+            entry = response_cache.get(("staff-list", since), version, build_delta)
+            if entry["body"] == b"null":
+                entry = None
+        
+        if entry is None:
+            entry = response_cache.get(("staff-list", None), version, lambda: {
+                "version": token,
+                "full": True,
+                "staffList": order,
+                "staffData": entries
+            })
+        
+        self.send_cached_json(entry, etag=etag)
+    
+    def handle_staff_page_request(self, params):
+        """Serve one filtered, sorted page of the staff list from the StaffIndex
+        
+        Query parameters: division, status, name (case-insensitive name
+        prefix), sort (status, name, division or last_activity; a leading
+        "-" sorts descending), page (from 1) and page_size (up to 500).
+        Responses include total matches, per-division and per-status counts
+        and every staff name for the whole directory.
+        
+        The body carries no data version, so its ETag changes only when this
+        page's result does. Clients send it back in If-None-Match and get a
+        304 while changes elsewhere in the directory leave their page alone.
+        """
+        sort = params.get("sort", "status")
+        descending = sort.startswith("-")
+        sort = sort.lstrip("-")
+        if sort not in STAFF_SORT_KEYS:
+            self.send_json({"error": f"sort must be one of: {', '.join(STAFF_SORT_KEYS)}"}, 400)
+            return
+        page = params.get("page", "1")
+        page = max(1, int(page)) if page.isdigit() else 1
+        page_size = params.get("page_size", "50")
+        page_size = max(1, min(int(page_size), 500)) if page_size.isdigit() else 50
+        division = params.get("division") if params.get("division") != "all" else None
+        status = params.get("status") if params.get("status") != "all" else None
+        name_prefix = params.get("name", "").strip()
+        
+        version, _, _ = staff_list_state.snapshot()
+        
+        def build_page():
+            result = staff_list_state.query(division, status, name_prefix, sort, descending, page, page_size)
+            del result["version"]
+            return dict(result, full=True, page=page, pageSize=page_size,
+                        pages=max(1, math.ceil(result["total"] / page_size)))
+        
+        entry = response_cache.get(
+            ("staff-list-page", division, status, name_prefix.lower(), sort, descending, page, page_size),
+            version, build_page)
+        self.send_cached_json(entry)
+
+    def handle_activity_request(self):
+        """Serve per-bucket activity heatmaps built from stored change scores
+        
+        Query parameters: date (YYYYMMDD, default today), staff (comma-separated
+        IDs, default everyone) and bucket (minutes per bucket, default 1).
+        """
+        params = dict(parse_qsl(urlparse(self.path).query))
+        day = params.get("date", datetime.now().strftime("%Y%m%d"))
+        if len(day) != 8 or not day.isdigit():
+            self.send_json({"error": "date must be YYYYMMDD"}, 400)
+            return
+        bucket = params.get("bucket", "1")
+        bucket = max(1, min(int(bucket), 1440)) if bucket.isdigit() else 1
+        if params.get("staff"):
+            # IDs become paths under .activity, so only plain names are accepted
+            staff_ids = [staff_id for staff_id in params["staff"].split(",")
+                         if staff_id and not staff_id.startswith('.') and os.path.basename(staff_id) == staff_id]
+        else:
+            _, staff_ids, _ = staff_list_state.snapshot()
+        
+        self.send_json({
+            "date": day,
+            "bucketMinutes": bucket,
+            "idleThreshold": config.get("activity", {}).get("idle_threshold", 2),
+            "heatmaps": {staff_id: activity.heatmap(staff_id, day, bucket) for staff_id in staff_ids}
+        })
+    
+    def handle_export_request(self, staff_id):
+        """Stream a tar or ZIP archive of a staff member's frames with a manifest
+        
+        /api/export/{staff_id}?start=ISO&end=ISO&format=tar|zip
+        
+        The archive is generated on the fly with chunked transfer encoding in
+        this request's own thread; tar members are sent with sendfile.
+        """
+        params = dict(parse_qsl(urlparse(self.path).query))
+        archive_format = params.get("format", "tar")
+        try:
+            start = local_time(datetime.fromisoformat(params["start"])) if "start" in params else None
+            end = local_time(datetime.fromisoformat(params["end"])) if "end" in params else None
+        except ValueError as e:
+            self.send_json({"error": f"Invalid parameter: {e}"}, 400)
+            return
+        if not staff_id or archive_format not in EXPORT_FORMATS:
+            self.send_json({"error": "A staff_id and a format of tar or zip are required"}, 400)
+            return
+        
+        frames = frame_index.range(staff_id, start, end)
+        throttle = Throttle(config.get("export", {}).get("max_bytes_per_second", 0))
+        
+        # Chunked encoding needs HTTP/1.1 for this response only
+        self.protocol_version = "HTTP/1.1"
+        self.close_connection = True
+        content_type = "application/x-tar" if archive_format == "tar" else "application/zip"
+        download_name = f"{staff_id}-{start.strftime('%Y%m%d') if start else 'all'}.{archive_format}"
+        
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Disposition', f'attachment; filename="{download_name}"')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        
+        def write(data):
+            if data:
+                self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+        
+        def sendfile(f, count):
+            if count:
+                self.wfile.write(b"%x\r\n" % count)
+                self.connection.sendfile(f, 0, count)
+                self.wfile.write(b"\r\n")
+        
+        staff_dir = os.path.join(config["screenshots_dir"], staff_id)
+        try:
+            if archive_format == "tar":
+                entries = stream_tar(write, sendfile, staff_dir, staff_id, frames, start, end, throttle)
+            else:
+                entries = stream_zip(write, staff_dir, staff_id, frames, start, end, throttle)
+            self.wfile.write(b"0\r\n\r\n")
+            logger.info(f"Exported {len(entries)} frames for {staff_id} as {archive_format}")
+        except (BrokenPipeError, ConnectionResetError):
+            logger.warning(f"Export for {staff_id} cancelled by the client")
+
+    def handle_snapshot_request(self):
+        """Find what every matching staff member's screen showed at a point in time
+        
+        /api/snapshot?at=ISO&division=NAME&staff_id=a,b&tolerance=SECONDS
+        """
+        params = dict(parse_qsl(urlparse(self.path).query))
+        try:
+            at = local_time(datetime.fromisoformat(params["at"]))
+            tolerance = max(0, min(int(params.get("tolerance", 300)), 86400))
+        except KeyError:
+            self.send_json({"error": "Missing at parameter"}, 400)
+            return
+        except ValueError as e:
+            self.send_json({"error": f"Invalid parameter: {e}"}, 400)
+            return
+        
+        division = params.get("division")
+        staff_filter = set(filter(None, params.get("staff_id", "").split(",")))
+        _, order, entries = staff_list_state.snapshot()
+        
+        results = []
+        missing = []
+        for staff_id in order:
+            entry = entries[staff_id]
+            if division and division != "all" and entry["division"] != division:
+                continue
+            if staff_filter and staff_id not in staff_filter:
+                continue
+            
+            found = frame_index.nearest(staff_id, at, tolerance)
+            if found and not os.path.exists(os.path.join(config["screenshots_dir"], staff_id, found[1])):
+                # Removed behind our back (e.g. retention); rebuild and retry once
+                frame_index.forget(staff_id)
+                found = frame_index.nearest(staff_id, at, tolerance)
             
+            if not found:
+                missing.append(staff_id)
+                continue
+            
+            timestamp, filename = found
+            results.append({
+                "staffId": staff_id,
+                "name": entry["name"],
+                "division": entry["division"],
+                "filename": filename,
+                "path": f"screenshots/{staff_id}/{filename}",
+                "timestamp": timestamp.isoformat(),
+                "offsetSeconds": int((timestamp - at).total_seconds())
+            })
+        
+        self.send_json({
+            "at": at.isoformat(),
+            "tolerance": tolerance,
+            "results": results,
+            "missing": missing
+        })
+
+    def handle_mosaic_request(self):
+        """Serve a single JPEG with every (or one division's) staff member's latest frame
+        
+        /api/mosaic?division=NAME&tile_width=W&columns=C
+        
+        tile_width is snapped to the nearest of MOSAIC_TILE_WIDTHS.
+        """
+        params = dict(parse_qsl(urlparse(self.path).query))
+        try:
+            tile_width = max(64, min(int(params.get("tile_width", 320)), 640))
+            columns = max(1, min(int(params["columns"]), 50)) if "columns" in params else None
+        except ValueError as e:
+            self.send_json({"error": f"Invalid parameter: {e}"}, 400)
+            return
+        
+        etag, mosaic_bytes = mosaic_builder.build(params.get("division"), tile_width, columns)
+        if etag is None:
+            self.send_json({"error": "No staff members match"}, 404)
+            return
+        
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(mosaic_bytes)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(mosaic_bytes)
+
+    def handle_live_stream(self, staff_id, keepalive=15):
+        """Stream a staff member's frames as multipart/x-mixed-replace (MJPEG)
+        
+        Frames are pushed as soon as ingest receives them. The last frame is
+        re-sent every keepalive seconds so dead viewers are noticed.
+        """
+        if not staff_id:
+            self.send_json({"error": "Missing staff_id parameter"}, 400)
+            return
+        
+        viewer = broadcaster.subscribe(staff_id)
+        try:
             self.send_response(200)
-            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-type', 'multipart/x-mixed-replace; boundary=frame')
+            self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
+            self.send_header('Pragma', 'no-cache')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(json.dumps(history_data).encode())
+            
+            # Start with the current frame so the viewer is not blank
+            frame = None
+            latest_path = os.path.join(config["screenshots_dir"], staff_id, "latest.jpg")
+            if os.path.isfile(latest_path):
+                with open(latest_path, 'rb') as f:
+                    frame = f.read()
+            
+            while True:
+                if frame:
+                    self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " +
+                                     str(len(frame)).encode() + b"\r\n\r\n" + frame + b"\r\n")
+                    self.wfile.flush()
+                try:
+                    frame = viewer.get(timeout=keepalive)
+                except queue.Empty:
+                    pass
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Live stream viewer for %s disconnected", staff_id, extra={"category": "request", "staff_id": staff_id})
+        finally:
+            broadcaster.unsubscribe(staff_id, viewer)
+
+    def handle_sprite_sheet_request(self, path):
+        """Serve a sprite sheet (image) or its offset map (JSON) for a time window
+        
+        /api/sprite-sheet/{staff_id}?start=ISO&end=ISO&frames=N&tile_width=W&columns=C
+        /api/sprite-sheet/{staff_id}/image?...same parameters...
+        """
+        parts = path[len("/api/sprite-sheet/"):].split('/')
+        staff_id = parts[0]
+        want_image = len(parts) > 1 and parts[1] == "image"
+        params = dict(parse_qsl(urlparse(self.path).query))
+        
+        if not staff_id:
+            self.send_json({"error": "Missing staff_id parameter"}, 400)
+            return
+        
+        try:
+            end = local_time(datetime.fromisoformat(params["end"])) if "end" in params else datetime.now()
+            start = local_time(datetime.fromisoformat(params["start"])) if "start" in params else end - timedelta(hours=1)
+            count = max(1, min(int(params.get("frames", 50)), SPRITE_MAX_FRAMES))
+            tile_width = max(32, min(int(params.get("tile_width", 160)), 480))
+            columns = max(1, min(int(params.get("columns", 10)), SPRITE_MAX_COLUMNS))
+        except ValueError as e:
+            self.send_json({"error": f"Invalid parameter: {e}"}, 400)
+            return
         
+        # The image URL handed out with the map pins the exact sheet by key
+        cached = None
+        if want_image and params.get("key"):
+            with sprite_cache_lock:
+                cached = sprite_cache.get(params["key"])
+        if cached:
+            key, sheet_bytes, offset_map = cached
         else:
-            # Unknown API endpoint
-            logger.warning(f"Unknown API endpoint requested: {path}")
-            self.send_response(404)
-            self.send_header('Content-type', 'application/json')
+            key, sheet_bytes, offset_map = get_sprite_sheet(staff_id, start, end, count, tile_width, columns)
+        
+        if not want_image:
+            if key:
+                query = urlencode(dict(params, key=key))
+                offset_map = dict(offset_map, sheet=f"/api/sprite-sheet/{staff_id}/image?{query}")
+            else:
+                offset_map = dict(offset_map, sheet=None)
+            self.send_json(offset_map)
+            return
+        
+        if not key:
+            self.send_json({"error": "No frames in the requested window"}, 404)
+            return
+        
+        etag = f'"{key}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
             self.end_headers()
-            self.wfile.write(json.dumps({"error": "API endpoint not found"}).encode())
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(sheet_bytes)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'private, max-age=3600')
+        self.end_headers()
+        self.wfile.write(sheet_bytes)
+
+    def send_json(self, data, status=200):
+        """Send a JSON response"""
+        self.send_cached_json(response_cache.encode(data), status)
+
+    def send_cached_json(self, entry, status=200, etag=None):
+        """Send a pre-encoded JSON response, gzip-compressed if the client accepts it"""
+        etag = etag or entry["etag"]
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        
+        body = entry["body"]
+        accepts_gzip = accepts_encoding(self.headers.get('Accept-Encoding', ''), 'gzip')
+        
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if status == 200:
+            self.send_header('ETag', etag)
+        if entry["gzip"] is not None and accepts_gzip:
+            body = entry["gzip"]
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def log_message(self, format, *args):
-        logger.info("%s - %s" % (self.address_string(), format % args))
+        logger.info("%s - %s", self.address_string(), format % args, extra={"category": "access"})
 
     def serve_file(self, file_path, content_type):
         """Helper method to serve a file with appropriate headers"""
@@ -351,7 +1813,7 @@ class HTTPHandler(BaseHTTPRequestHandler):
                 
                 # Add content length header for screenshots
                 self.send_header('Content-Length', str(os.path.getsize(file_path)))
-                logger.info(f"Serving screenshot file: {file_path} ({os.path.getsize(file_path)} bytes)")
+                logger.info("Serving screenshot file: %s", file_path, extra={"category": "screenshot"})
             
             self.end_headers()
             
@@ -369,7 +1831,7 @@ class HTTPHandler(BaseHTTPRequestHandler):
                         # For other files, read all at once
                         self.wfile.write(f.read())
                     
-                logger.info(f"Successfully served file: {file_path}")
+                logger.debug("Successfully served file: %s", file_path, extra={"category": "static"})
             except Exception as e:
                 logger.error(f"Error reading file {file_path}: {e}")
                 self.wfile.write(b"Error reading file")
@@ -382,13 +1844,14 @@ class HTTPHandler(BaseHTTPRequestHandler):
             self.wfile.write(f"404 - File Not Found: {file_path}".encode())
             return False
 
-    def get_staff_history(self, staff_id, date_filter=None, limit=20):
+    def get_staff_history(self, staff_id, date_filter=None, limit=20, skip_idle=False):
         """Get history data for a staff member
         
         Args:
             staff_id (str): ID of the staff member
             date_filter (str, optional): Date filter in YYYYMMDD format
             limit (int, optional): Maximum number of history items to return
+            skip_idle (bool, optional): Leave out frames that barely changed from the previous one
         
         Returns:
             dict: History data for the staff member
@@ -415,47 +1878,47 @@ class HTTPHandler(BaseHTTPRequestHandler):
             logger.warning(f"Staff directory not found: {staff_dir}")
             return history_data
         
-        # Get screenshot files
-        screenshot_files = [f for f in os.listdir(staff_dir) if f.endswith('.jpg') and f != 'latest.jpg']
-        
-        # Get available dates from filenames
-        all_dates = set()
-        date_filtered_files = []
+        # Capture times come from the {staff_id}-YYYYMMDD-HHMMSS.jpg names
+        frame_times = {}
+        for file in os.listdir(staff_dir):
+            if not file.endswith('.jpg') or file == 'latest.jpg':
+                continue
+            timestamp = parse_frame_timestamp(staff_id, file)
+            if timestamp is not None:
+                frame_times[file] = timestamp
         
-        for file in screenshot_files:
-            # Extract date from filename if possible (format depends on your naming convention)
-            try:
-                # Assuming filename format is staff_id-YYYY-MM-DD.jpg or similar
-                date_part = file.split('-')[1:4]  # Extract date parts
-                if len(date_part) >= 3:
-                    date_str = f"{date_part[0]}{date_part[1]}{date_part[2].split('.')[0]}"
-                    all_dates.add(date_str)
-                    
-                    # Apply date filter if provided
-                    if date_filter and date_filter != 'all':
-                        if date_str == date_filter:
-                            date_filtered_files.append(file)
-                    else:
-                        date_filtered_files.append(file)
-            except Exception as e:
-                logger.warning(f"Error parsing date from filename {file}: {e}")
-                date_filtered_files.append(file)  # Include files with unparseable dates
+        # Available dates cover every frame; the date filter only narrows the list
+        all_dates = {timestamp.strftime("%Y%m%d") for timestamp in frame_times.values()}
+        files_to_process = [file for file, timestamp in frame_times.items()
+                            if not date_filter or date_filter == 'all' or timestamp.strftime("%Y%m%d") == date_filter]
         
-        # If date filter was applied, use filtered files, otherwise use all files
-        files_to_process = date_filtered_files if date_filter else screenshot_files
+        # Newest first
+        files_to_process.sort(key=lambda x: frame_times[x], reverse=True)
         
-        # Sort by modification time (newest first)
-        files_to_process.sort(key=lambda x: os.path.getmtime(os.path.join(staff_dir, x)), reverse=True)
+        # Change scores from the activity index (None for frames never scored)
+        day_scores = {}
+        def frame_score(file):
+            moment = frame_times[file]
+            day = moment.strftime("%Y%m%d")
+            if day not in day_scores:
+                day_scores[day] = activity.scores(staff_id, day) if activity else {}
+            return day_scores[day].get(moment.hour * 3600 + moment.minute * 60 + moment.second)
         
         # Build history items (respect the limit)
+        idle_threshold = config.get("activity", {}).get("idle_threshold", 2)
         history_items = []
-        for file in files_to_process[:limit]:
-            file_path = os.path.join(staff_dir, file)
-            timestamp = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+        for file in files_to_process:
+            if len(history_items) >= limit:
+                break
+            score = frame_score(file)
+            if skip_idle and score is not None and score < idle_threshold:
+                continue
+            timestamp = frame_times[file].isoformat()
             history_items.append({
                 "filename": file,
                 "path": f"screenshots/{staff_id}/{file}",
-                "timestamp": timestamp
+                "timestamp": timestamp,
+                "activity": score
             })
         
         history_data["history"] = history_items
@@ -463,6 +1926,429 @@ class HTTPHandler(BaseHTTPRequestHandler):
         
         return history_data
 
+# Content-addressed frame store, event journal and activity scores, created once the config is loaded
+frame_store = None
+journal = None
+compactor = None
+activity = None
+
+# Default journal settings (admin_config.json "journal")
+DEFAULT_JOURNAL_SETTINGS = {
+    "flush_interval": 1,          # Seconds between appends of buffered events
+    "compaction_interval": 600,   # Seconds between snapshots
+    "compaction_events": 100000   # Snapshot early after this many events
+}
+
+async def maintain_journal(settings):
+    """Flush buffered journal events and activity scores, and compact the journal periodically"""
+    settings = dict(DEFAULT_JOURNAL_SETTINGS, **settings)
+    last_compaction = time.monotonic()
+    while True:
+        await asyncio.sleep(settings["flush_interval"])
+        journal.flush()
+        activity.flush()
+        if (time.monotonic() - last_compaction >= settings["compaction_interval"]
+                or journal.events_since_compaction >= settings["compaction_events"]):
+            last_compaction = time.monotonic()
+            try:
+                # Snapshot writes and fsync run off the event loop
+                await asyncio.to_thread(journal.compact, config.get("retention_days"))
+            except Exception as e:
+                logger.error(f"Error compacting journal: {e}")
+
+# Default presence settings (admin_config.json "presence")
+DEFAULT_PRESENCE_SETTINGS = {
+    "tick_interval": 1,     # Seconds per timer wheel slot
+    "ping_interval": 15,    # Seconds between websocket pings
+    "ping_timeout": 15,     # Seconds to wait for a pong before closing
+    "idle_after": 30,       # Seconds without a frame before active -> idle
+    "inactive_after": 90    # Seconds without any heartbeat before -> inactive
+}
+
+class TimerWheel:
+    """Hashed timer wheel with O(1) schedule, cancel and tick
+    
+    Delays are rounded up to whole ticks and must not exceed the wheel span.
+    """
+    def __init__(self, tick_interval, span):
+        self.tick_interval = tick_interval
+        self.slots = [set() for _ in range(int(math.ceil(span / tick_interval)) + 2)]
+        self.cursor = 0
+        self.positions = {}  # timer key -> slot index
+    
+    def schedule(self, key, delay):
+        """(Re)schedule key to fire after delay seconds"""
+        self.cancel(key)
+        ticks = min(max(1, int(math.ceil(delay / self.tick_interval))), len(self.slots) - 1)
+        slot = (self.cursor + ticks) % len(self.slots)
+        self.slots[slot].add(key)
+        self.positions[key] = slot
+    
+    def cancel(self, key):
+        slot = self.positions.pop(key, None)
+        if slot is not None:
+            self.slots[slot].discard(key)
+    
+    def tick(self):
+        """Advance one slot and return the keys that fired"""
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        fired = self.slots[self.cursor]
+        self.slots[self.cursor] = set()
+        for key in fired:
+            del self.positions[key]
+        return fired
+
+class PresenceTracker:
+    """Tracks staff presence from frame arrivals and websocket heartbeats
+    
+    States are "active" (frames arriving), "idle" (connected and answering
+    pings, but no frames for idle_after) and "inactive" (disconnected or no
+    heartbeat for inactive_after). Timers live on a timer wheel driven by the
+    event loop, so each tick only touches the timers that expire in it.
+    Subscribers are called with (staff_id, old_state, new_state) on every
+    transition. Only the connection that authenticated last can end a staff
+    member's presence, so a stale duplicate closing after a reconnect is
+    ignored.
+    """
+    def __init__(self, settings=None):
+        self.lock = threading.Lock()
+        self.states = {}
+        self.connections = {}  # staff_id -> connection that owns the presence state
+        self.subscribers = []
+        self.configure(settings or {})
+    
+    def configure(self, settings):
+        self.settings = dict(DEFAULT_PRESENCE_SETTINGS, **settings)
+        span = max(self.settings["idle_after"], self.settings["inactive_after"])
+        self.wheel = TimerWheel(self.settings["tick_interval"], span)
+    
+    def subscribe(self, callback):
+        """Register a callback(staff_id, old_state, new_state) for transitions"""
+        self.subscribers.append(callback)
+    
+    def state(self, staff_id):
+        """Get a staff member's presence state (safe from any thread)"""
+        with self.lock:
+            return self.states.get(staff_id, "inactive")
+    
+    def snapshot(self):
+        with self.lock:
+            return dict(self.states)
+    
+    def frame(self, staff_id):
+        """Record a frame (or authentication) from a staff member"""
+        self.wheel.schedule((staff_id, "idle"), self.settings["idle_after"])
+        self.wheel.schedule((staff_id, "inactive"), self.settings["inactive_after"])
+        self._transition(staff_id, "active")
+    
+    def connect(self, staff_id, connection):
+        """Record an authenticated connection, replacing any earlier one"""
+        self.connections[staff_id] = connection
+        self.frame(staff_id)
+    
+    def heartbeat(self, staff_id):
+        """Record a pong from a staff member's connection"""
+        self.wheel.schedule((staff_id, "inactive"), self.settings["inactive_after"])
+        if self.state(staff_id) == "inactive":
+            self._transition(staff_id, "idle")
+    
+    def disconnect(self, staff_id, connection):
+        """Record that a staff member's connection closed, unless a newer one replaced it"""
+        if self.connections.get(staff_id) is not connection:
+            return
+        del self.connections[staff_id]
+        self.wheel.cancel((staff_id, "idle"))
+        self.wheel.cancel((staff_id, "inactive"))
+        self._transition(staff_id, "inactive")
+    
+    def tick(self):
+        """Advance the wheel and apply expired timers"""
+        for staff_id, timer in self.wheel.tick():
+            if timer == "idle":
+                if self.state(staff_id) == "active":
+                    self._transition(staff_id, "idle")
+            else:
+                self.wheel.cancel((staff_id, "idle"))
+                self._transition(staff_id, "inactive")
+    
+    async def run(self):
+        """Drive the timer wheel from the event loop"""
+        interval = self.settings["tick_interval"]
+        next_tick = time.monotonic() + interval
+        while True:
+            await asyncio.sleep(max(0, next_tick - time.monotonic()))
+            next_tick += interval
+            self.tick()
+    
+    def _transition(self, staff_id, new_state):
+        with self.lock:
+            old_state = self.states.get(staff_id, "inactive")
+            if old_state == new_state:
+                return
+            self.states[staff_id] = new_state
+        for callback in self.subscribers:
+            try:
+                callback(staff_id, old_state, new_state)
+            except Exception as e:
+                logger.error(f"Error in presence subscriber: {e}")
+
+presence = PresenceTracker()
+
+def log_presence_transition(staff_id, old_state, new_state):
+    logger.info(f"Staff member {staff_id} is now {new_state} (was {old_state})")
+
+presence.subscribe(lambda staff_id, old_state, new_state: staff_list_state.bump(staff_id))
+presence.subscribe(log_presence_transition)
+
+# Default admission control settings (admin_config.json "admission")
+DEFAULT_ADMISSION_SETTINGS = {
+    "max_connections": 500,              # Concurrent staff connections
+    "max_frame_bytes": 4 * 1024 * 1024,  # Largest accepted screenshot
+    "frames_per_second": 1,              # Per-staff sustained frame rate
+    "frame_burst": 5,                    # Per-staff burst allowance
+    "max_ingest_bytes_per_second": 50 * 1024 * 1024,  # Across all staff, 0 = unlimited
+    "control_interval": 10,              # Minimum seconds between slow-down messages per client
+    "slow_down_seconds": 60              # How long a client keeps a slowed-down interval
+}
+
+class TokenBucket:
+    """Token bucket refilled at rate tokens per second up to capacity"""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def take(self, amount=1):
+        """Take tokens if available; return True on success"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+class AdmissionController:
+    """Connection limits, frame size limits and rate limits for ingest
+    
+    Per-client state is keyed by connection, so a stale duplicate connection
+    closing does not reset the limits of the staff member's live one.
+    Runs on the event loop; counters are read by the HTTP thread, which
+    only needs approximate values.
+    """
+    def __init__(self, settings=None):
+        self.connections = 0
+        self.buckets = {}  # connection -> TokenBucket
+        self.last_control = {}  # connection -> time of last slow-down message
+        self.rejections = {"connections": 0, "frame_size": 0, "frame_rate": 0, "bandwidth": 0}
+        self.configure(settings or {})
+    
+    def configure(self, settings):
+        self.settings = dict(DEFAULT_ADMISSION_SETTINGS, **settings)
+        bandwidth = self.settings["max_ingest_bytes_per_second"]
+        # One second of bandwidth as burst, but always room for one maximum frame
+        self.bandwidth = TokenBucket(bandwidth, max(bandwidth, self.settings["max_frame_bytes"])) if bandwidth else None
+    
+    @property
+    def min_interval(self):
+        """Smallest screenshot interval a client may use"""
+        return 1 / self.settings["frames_per_second"]
+    
+    def open_connection(self):
+        """Admit a new connection; return False when at capacity"""
+        if self.connections >= self.settings["max_connections"]:
+            self.rejections["connections"] += 1
+            return False
+        self.connections += 1
+        return True
+    
+    def close_connection(self, connection):
+        self.connections -= 1
+        self.buckets.pop(connection, None)
+        self.last_control.pop(connection, None)
+    
+    def check_frame(self, connection, size):
+        """Check an incoming frame; return None if accepted or the rejection reason"""
+        if size > self.settings["max_frame_bytes"]:
+            reason = "frame_size"
+        else:
+            bucket = self.buckets.get(connection)
+            if bucket is None:
+                bucket = TokenBucket(self.settings["frames_per_second"], self.settings["frame_burst"])
+                self.buckets[connection] = bucket
+            if not bucket.take():
+                reason = "frame_rate"
+            elif self.bandwidth and not self.bandwidth.take(size):
+                reason = "bandwidth"
+            else:
+                return None
+        self.rejections[reason] += 1
+        return reason
+    
+    def control_message(self, connection, reason):
+        """Build a slow-down message for a rejected frame, or None if one was sent recently"""
+        now = time.monotonic()
+        if now - self.last_control.get(connection, 0) < self.settings["control_interval"]:
+            return None
+        self.last_control[connection] = now
+        
+        # The client returns to its capture profile after duration seconds
+        message = {"type": "control", "action": "slow_down", "reason": reason,
+                   "duration": self.settings["slow_down_seconds"]}
+        if reason == "frame_size":
+            message["max_frame_bytes"] = self.settings["max_frame_bytes"]
+        elif reason == "bandwidth":
+            # Spread the fleet out more while total bandwidth is saturated
+            message["interval"] = max(self.min_interval * 2, 5)
+        else:
+            message["interval"] = self.min_interval
+        return message
+    
+    def stats(self):
+        return {
+            "connections": self.connections,
+            "maxConnections": self.settings["max_connections"],
+            "rejections": dict(self.rejections)
+        }
+
+admission = AdmissionController()
+
+# Default capture profile settings (admin_config.json "capture")
+DEFAULT_CAPTURE_SETTINGS = {
+    "reload_interval": 5,  # Seconds between config and schedule checks
+    "business_hours": {"days": [0, 1, 2, 3, 4], "start": "08:00", "end": "18:00"},
+    "profiles": {},        # name -> {"interval", "quality", "max_width", "off_hours": {...}}
+    "divisions": {},       # division -> profile name
+    "staff": {},           # staff_id -> profile name
+    "override": None       # Profile name applied to everyone, e.g. while the WAN is saturated
+}
+
+CAPTURE_KEYS = ("interval", "quality", "max_width")
+
+class CaptureProfiles:
+    """Per-staff and per-division capture settings pushed to connected staff apps
+    
+    A staff member's profile is the override if set, else their own
+    assignment, else their division's, else "default". Outside business
+    hours a profile's "off_hours" values replace its own. Settings are sent
+    as a "configure" control message on authentication and again whenever
+    the resolved values change (config edit or schedule boundary). Runs on
+    the event loop.
+    """
+    def __init__(self, settings=None):
+        self.clients = {}  # staff_id -> (websocket, division)
+        self.sent = {}     # staff_id -> last settings sent
+        self.configure(settings or {})
+    
+    def configure(self, settings):
+        self.settings = dict(DEFAULT_CAPTURE_SETTINGS, **settings)
+    
+    def in_business_hours(self, now):
+        hours = self.settings["business_hours"]
+        if now.weekday() not in hours.get("days", range(7)):
+            return False
+        return hours.get("start", "00:00") <= now.strftime("%H:%M") < hours.get("end", "24:00")
+    
+    def resolve(self, staff_id, division, now=None):
+        """Get the capture settings for a staff member, or None if no profile applies"""
+        now = now or datetime.now()
+        name = (self.settings["override"]
+                or self.settings["staff"].get(staff_id)
+                or self.settings["divisions"].get(division)
+                or "default")
+        profile = self.settings["profiles"].get(name)
+        if not profile:
+            return None
+        
+        schedule = "business_hours" if self.in_business_hours(now) else "off_hours"
+        values = {key: profile[key] for key in CAPTURE_KEYS if key in profile}
+        if schedule == "off_hours":
+            values.update({key: value for key, value in profile.get("off_hours", {}).items() if key in CAPTURE_KEYS})
+        if "interval" in values:
+            # Never ask for more frames than admission control accepts
+            values["interval"] = max(values["interval"], admission.min_interval)
+        return dict(values, profile=name, schedule=schedule)
+    
+    def connect(self, staff_id, division, websocket):
+        self.clients[staff_id] = (websocket, division)
+        self.sent.pop(staff_id, None)
+    
+    def disconnect(self, staff_id, websocket):
+        if self.clients.get(staff_id, (None,))[0] is websocket:
+            del self.clients[staff_id]
+            self.sent.pop(staff_id, None)
+    
+    async def push(self, staff_id, now=None):
+        """Send a staff member their settings if they changed since the last push"""
+        client = self.clients.get(staff_id)
+        if client is None:
+            return  # Disconnected while other pushes were in flight
+        websocket, division = client
+        values = self.resolve(staff_id, division, now)
+        if values is None or values == self.sent.get(staff_id):
+            return
+        self.sent[staff_id] = values
+        try:
+            await websocket.send(json.dumps(dict(values, type="control", action="configure")))
+            logger.info("Sent capture profile %s (%s) to %s", values["profile"], values["schedule"], staff_id,
+                        extra={"category": "request", "staff_id": staff_id})
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            # Try again on the next check
+            if self.sent.get(staff_id) is values:
+                self.sent.pop(staff_id, None)
+            logger.error(f"Error sending capture profile to {staff_id}: {e}")
+    
+    async def run(self, config_path="admin_config.json"):
+        """Reload the capture section on change and re-push across schedule boundaries"""
+        config_mtime = None
+        while True:
+            try:
+                mtime = os.path.getmtime(config_path)
+                if mtime != config_mtime:
+                    with open(config_path, "r") as f:
+                        self.configure(json.load(f).get("capture", {}))
+                    if config_mtime is not None:
+                        logger.info("Capture profiles reloaded")
+                    config_mtime = mtime
+            except Exception as e:
+                logger.error(f"Error reloading capture profiles: {e}")
+            
+            # Push to every client at once so one slow connection does not hold up the fleet
+            now = datetime.now()
+            staff_ids = list(self.clients)
+            results = await asyncio.gather(*(self.push(staff_id, now) for staff_id in staff_ids),
+                                           return_exceptions=True)
+            for staff_id, result in zip(staff_ids, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error pushing capture profile to {staff_id}: {result}")
+            await asyncio.sleep(self.settings["reload_interval"])
+    
+    def state(self):
+        """Get the settings last sent to each connected staff member"""
+        return {staff_id: self.sent.get(staff_id) for staff_id in self.clients}
+
+capture_profiles = CaptureProfiles()
+
+async def send_heartbeats(websocket, staff_id):
+    """Ping a staff connection and feed pongs to the presence tracker"""
+    interval = presence.settings["ping_interval"]
+    timeout = presence.settings["ping_timeout"]
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            pong_waiter = await websocket.ping()
+            await asyncio.wait_for(pong_waiter, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No pong from {staff_id} within {timeout}s, closing connection")
+            await websocket.close(code=1011, reason="keepalive ping timeout")
+            return
+        except websockets.exceptions.ConnectionClosed:
+            return
+        presence.heartbeat(staff_id)
+
 # WebSocket server handler
 async def handle_client(websocket):
     """Handle a WebSocket client"""
@@ -470,10 +2356,20 @@ async def handle_client(websocket):
     staff_id = None
     staff_info = {}
     staff_authenticated = False
+    heartbeat_task = None
+    journal_connection = None  # Sequence number of this connection's auth event
     ip_address = websocket.remote_address[0] if hasattr(websocket, 'remote_address') else 'unknown'
     
     logger.info(f"Connection open from {ip_address}")
     
+    journal.record("connect", ip=ip_address)
+    
+    if not admission.open_connection():
+        logger.warning(f"Rejecting connection from {ip_address}: server at capacity")
+        await websocket.send(json.dumps({"status": "error", "message": "Server at capacity", "retry_after": 30}))
+        await websocket.close(code=1013, reason="server at capacity")
+        return
+    
     try:
         async for message in websocket:
             # For binary messages (screenshot data)
@@ -481,6 +2377,15 @@ async def handle_client(websocket):
                 if not staff_authenticated:
                     logger.warning("Received binary data from unauthenticated client, ignoring")
                     continue
+                
+                rejection = admission.check_frame(websocket, len(message))
+                if rejection:
+                    logger.info("Rejected frame from %s (%s, %d bytes)", staff_id, rejection, len(message),
+                                extra={"category": "frame", "staff_id": staff_id})
+                    control = admission.control_message(websocket, rejection)
+                    if control:
+                        await websocket.send(json.dumps(control))
+                    continue
                     
                 # We should have received a JSON message before this with metadata
                 if not hasattr(websocket, 'current_screenshot_file'):
@@ -496,34 +2401,22 @@ async def handle_client(websocket):
                 screenshots_dir = config["screenshots_dir"]
                 staff_screenshots_dir = ensure_directories(screenshots_dir, staff_id)
                 
-                # Save to staff subdirectory
-                file_path = os.path.join(staff_screenshots_dir, os.path.basename(screenshot_file))
-                
                 try:
-                    # Write the screenshot data to file
-                    with open(file_path, 'wb') as f:
-                        f.write(message)
+                    # Store through the blob store; the staff frame and latest.jpg
+                    # become links to a single copy of identical content
+                    file_path = frame_store.store_frame(staff_screenshots_dir, os.path.basename(screenshot_file), message)
                     
-                    logger.info(f"Saved screenshot file: {file_path} ({len(message)} bytes)")
+                    logger.info("Saved screenshot file: %s (%d bytes)", file_path, len(message),
+                                extra={"category": "frame", "staff_id": staff_id})
+                    presence.frame(staff_id)
+                    broadcaster.publish(staff_id, message)
+                    frame_index.add(staff_id, os.path.basename(file_path))
+                    # Scoring decodes the frame at reduced scale; keep it off the event loop
+                    await asyncio.to_thread(activity.record, staff_id, os.path.basename(file_path), message)
                     
-                    # Create a copy as latest.jpg
-                    latest_path = os.path.join(staff_screenshots_dir, "latest.jpg")
-                    try:
-                        if os.path.exists(latest_path):
-                            os.remove(latest_path)
-                        shutil.copy2(file_path, latest_path)
-                        logger.info(f"Created latest.jpg for {staff_id}")
-                    except Exception as e:
-                        logger.error(f"Error creating latest.jpg: {e}")
-                    
-                    # Update staff metadata
-                    staff_info["last_activity"] = datetime.now().isoformat()
-                    staff_info["activity_status"] = "active"
-                    
-                    # Write metadata
-                    metadata_file = os.path.join(staff_screenshots_dir, "metadata.json")
-                    with open(metadata_file, "w") as f:
-                        json.dump(staff_info, f)
+                    # Buffered append; no per-frame metadata rewrite
+                    journal.record("frame", staff_id)
+                    staff_list_state.bump(staff_id)
                         
                 except Exception as e:
                     logger.error(f"Error saving screenshot file: {e}")
@@ -558,14 +2451,20 @@ async def handle_client(websocket):
                     
                     # Create directories for this staff member
                     screenshots_dir = config["screenshots_dir"]
-                    staff_screenshots_dir = ensure_directories(screenshots_dir, staff_id)
+                    ensure_directories(screenshots_dir, staff_id)
                     
-                    # Write metadata file
-                    metadata_file = os.path.join(staff_screenshots_dir, "metadata.json")
-                    with open(metadata_file, "w") as f:
-                        json.dump(staff_info, f)
+                    journal_connection = journal.record("auth", staff_id, flush=True, ip=ip_address,
+                                   name=staff_info["name"], division=staff_info["division"])
+                    staff_list_state.bump(staff_id)
+                    presence.connect(staff_id, websocket)
+                    if heartbeat_task is None:
+                        heartbeat_task = asyncio.create_task(send_heartbeats(websocket, staff_id))
                     
                     await websocket.send(json.dumps({"status": "authenticated", "message": "Authentication successful"}))
+                    
+                    # Apply the server-side capture profile without waiting for the next check
+                    capture_profiles.connect(staff_id, staff_info["division"], websocket)
+                    await capture_profiles.push(staff_id)
                 
                 # Screenshot metadata message
                 elif msg_type == "screenshot_data":
@@ -575,16 +2474,12 @@ async def handle_client(websocket):
                     
                     # Store the filename for the upcoming binary message
                     screenshot_file = data.get("filename")
-                    timestamp = data.get("timestamp", datetime.now().isoformat())
                     
                     # Attach to websocket object so we can access it when we get the binary data
                     setattr(websocket, 'current_screenshot_file', screenshot_file)
                     
-                    logger.info(f"Received screenshot metadata for {staff_id}, filename: {screenshot_file}")
-                    
-                    # Update staff metadata
-                    staff_info["last_activity"] = timestamp
-                    staff_info["activity_status"] = "active"
+                    logger.debug("Received screenshot metadata for %s, filename: %s", staff_id, screenshot_file,
+                                 extra={"category": "frame", "staff_id": staff_id})
                     
                 # Other message types
                 else:
@@ -600,24 +2495,18 @@ async def handle_client(websocket):
     except Exception as e:
         logger.error(f"Error in WebSocket handler: {e}")
     finally:
+        admission.close_connection(websocket)
+        
         # Log the disconnection
         if staff_id:
             logger.info(f"Staff member {staff_id} disconnected")
+            if heartbeat_task:
+                heartbeat_task.cancel()
             # Mark staff as inactive
             if staff_authenticated:
-                screenshots_dir = config["screenshots_dir"]
-                metadata_file = os.path.join(screenshots_dir, staff_id, "metadata.json")
-                try:
-                    with open(metadata_file, "r") as f:
-                        metadata = json.load(f)
-                    
-                    metadata["activity_status"] = "inactive"
-                    metadata["last_activity"] = datetime.now().isoformat()
-                    
-                    with open(metadata_file, "w") as f:
-                        json.dump(metadata, f)
-                except Exception as e:
-                    logger.error(f"Error updating metadata: {e}")
+                journal.record("disconnect", staff_id, flush=True, ip=ip_address, connection=journal_connection)
+                capture_profiles.disconnect(staff_id, websocket)
+                presence.disconnect(staff_id, websocket)
         else:
             logger.info(f"Unknown client disconnected: {ip_address}")
 
@@ -633,7 +2522,9 @@ class HTTPServerThread(threading.Thread):
     def run(self):
         try:
             handler = HTTPHandler
-            self.server = HTTPServer((self.host, self.port), handler)
+            # One thread per request so live streams do not block other requests
+            self.server = ThreadingHTTPServer((self.host, self.port), handler)
+            self.server.daemon_threads = True
             logger.info(f"HTTP server starting on http://{self.host}:{self.port}")
             self.server.serve_forever()
         except Exception as e:
@@ -646,7 +2537,7 @@ class HTTPServerThread(threading.Thread):
 # Main server
 async def run_server():
     """Main server function"""
-    global config
+    global config, frame_store, journal, compactor, activity
     # Load configuration
     config = load_config()
     host = config["host"]
@@ -656,6 +2547,33 @@ async def run_server():
     # Ensure directories exist
     screenshots_dir = config["screenshots_dir"]
     os.makedirs(screenshots_dir, exist_ok=True)
+    frame_store = FrameStore(screenshots_dir)
+    
+    # Restore staff state and sessions from the event journal
+    journal = EventJournal(screenshots_dir)
+    journal.load()
+    atexit.register(journal.flush)
+    activity = ActivityIndex(screenshots_dir)
+    atexit.register(activity.flush)
+    journal_task = asyncio.create_task(maintain_journal(config.get("journal", {})))
+    
+    admission.configure(config.get("admission", {}))
+    
+    # Start the presence timer wheel
+    presence.configure(config.get("presence", {}))
+    presence_task = asyncio.create_task(presence.run())
+    
+    # Push capture profiles and follow config edits and business hours
+    capture_profiles.configure(config.get("capture", {}))
+    capture_task = asyncio.create_task(capture_profiles.run())
+    
+    # Build the frame index from existing filenames in the background
+    threading.Thread(target=frame_index.load_all, daemon=True).start()
+    
+    # Recompress aging frames into their storage tiers in the background
+    compactor = FrameCompactor(screenshots_dir, frame_store, config.get("compaction", {}))
+    if compactor.settings["enabled"]:
+        CompactionThread(compactor).start()
     
     # Start HTTP server in a separate thread
     http_server = HTTPServerThread(host, http_port)
@@ -663,11 +2581,20 @@ async def run_server():
     
     # Start WebSocket server
     stop = asyncio.Future()
-    async with websockets.serve(handle_client, host, ws_port):
+    # Keepalive pings are sent by send_heartbeats so pongs reach the presence tracker
+    # Oversized frames are rejected with a control message by the admission
+    # controller; only far larger messages are cut off by the library
+    max_message = admission.settings["max_frame_bytes"] * 4
+    async with websockets.serve(handle_client, host, ws_port, ping_interval=None, max_size=max_message):
         logger.info(f"WebSocket server started on ws://{host}:{ws_port}")
         await stop
         
     # Clean up
+    presence_task.cancel()
+    capture_task.cancel()
+    journal_task.cancel()
+    journal.flush()
+    activity.flush()
     http_server.stop()
 
 # Handle graceful shutdown
@@ -677,6 +2604,73 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 # Update the staff list API to include screenshot information
+def staff_list_entry(staff):
+    """Convert a get_staff_list() item to a staff list API entry"""
+    return {
+        "name": staff["name"],
+        "division": staff["division"],
+        "recording_status": staff["activity_status"],
+        "timestamp": staff.get("last_activity", datetime.now().isoformat()),
+        "screenshot_path": staff["screenshot_path"]
+    }
+
+def get_staff_info(screenshots_dir, staff_id):
+    """Get a staff member's details and latest screenshot path, or None if they have no directory"""
+    staff_dir = os.path.join(screenshots_dir, staff_id)
+    if not os.path.isdir(staff_dir):
+        return None
+    metadata_file = os.path.join(staff_dir, "metadata.json")
+    
+    # Default values
+    staff_info = {
+        "staff_id": staff_id,
+        "name": "Unknown User",
+        "division": "Unassigned",
+        "activity_status": "inactive",
+        "last_activity": None,
+        "screenshot_path": None
+    }
+    
+    # Staff details come from the event journal; metadata.json is only
+    # read for staff members the journal has not seen yet
+    journal_state = journal.staff_state(staff_id) if journal else None
+    if journal_state:
+        staff_info["name"] = journal_state["name"]
+        staff_info["division"] = journal_state["division"]
+        staff_info["last_activity"] = journal_state["last_activity"]
+    elif os.path.exists(metadata_file):
+        try:
+            with open(metadata_file, "r") as f:
+                metadata = json.load(f)
+            staff_info.update(metadata)
+        except Exception as e:
+            logger.error(f"Error reading metadata for {staff_id}: {e}")
+    
+    # Find the latest screenshot file
+    # First, check for latest.jpg
+    latest_jpg = os.path.join(staff_dir, "latest.jpg")
+    if os.path.exists(latest_jpg) and os.path.isfile(latest_jpg):
+        staff_info["screenshot_path"] = f"screenshots/{staff_id}/latest.jpg"
+    else:
+        # Look for other JPG files
+        jpg_files = [f for f in os.listdir(staff_dir) if f.endswith(".jpg")]
+        if jpg_files:
+            # Sort by creation time, newest first
+            jpg_files.sort(key=lambda x: os.path.getctime(os.path.join(staff_dir, x)), reverse=True)
+            latest_screenshot = jpg_files[0]
+            
+            # Set relative path for browser to access
+            staff_info["screenshot_path"] = f"screenshots/{staff_id}/{latest_screenshot}"
+            
+            logger.debug(f"Latest screenshot for {staff_id}: {latest_screenshot}")
+        else:
+            logger.warning(f"No screenshots found for staff {staff_id}")
+            staff_info["screenshot_path"] = None
+    
+    # Status comes from the presence tracker, not from the metadata file
+    staff_info["activity_status"] = presence.state(staff_id)
+    return staff_info
+
 def get_staff_list():
     """Get a list of all staff members and their screenshot paths"""
     global config
@@ -688,69 +2682,16 @@ def get_staff_list():
         return []
     
     # First, get all subdirectories in the screenshots directory (each is a staff ID)
-    staff_dirs = [d for d in os.listdir(screenshots_dir) if os.path.isdir(os.path.join(screenshots_dir, d))]
+    # Skip hidden directories such as the .cache used for sprite sheets
+    staff_dirs = [d for d in os.listdir(screenshots_dir) if not d.startswith('.') and os.path.isdir(os.path.join(screenshots_dir, d))]
     staff_ids_found = set()
     
     # Process staff dirs
     for staff_id in staff_dirs:
         staff_ids_found.add(staff_id)
-        staff_dir = os.path.join(screenshots_dir, staff_id)
-        metadata_file = os.path.join(staff_dir, "metadata.json")
-        
-        # Default values
-        staff_info = {
-            "staff_id": staff_id,
-            "name": "Unknown User",
-            "division": "Unassigned",
-            "activity_status": "inactive",
-            "last_activity": None,
-            "screenshot_path": None
-        }
-        
-        # Try to read metadata
-        if os.path.exists(metadata_file):
-            try:
-                with open(metadata_file, "r") as f:
-                    metadata = json.load(f)
-                staff_info.update(metadata)
-            except Exception as e:
-                logger.error(f"Error reading metadata for {staff_id}: {e}")
-        
-        # Find the latest screenshot file
-        # First, check for latest.jpg
-        latest_jpg = os.path.join(staff_dir, "latest.jpg")
-        if os.path.exists(latest_jpg) and os.path.isfile(latest_jpg):
-            staff_info["screenshot_path"] = f"screenshots/{staff_id}/latest.jpg"
-        else:
-            # Look for other JPG files
-            jpg_files = [f for f in os.listdir(staff_dir) if f.endswith(".jpg")]
-            if jpg_files:
-                # Sort by creation time, newest first
-                jpg_files.sort(key=lambda x: os.path.getctime(os.path.join(staff_dir, x)), reverse=True)
-                latest_screenshot = jpg_files[0]
-                
-                # Set relative path for browser to access
-                staff_info["screenshot_path"] = f"screenshots/{staff_id}/{latest_screenshot}"
-                
-                logger.debug(f"Latest screenshot for {staff_id}: {latest_screenshot}")
-            else:
-                logger.warning(f"No screenshots found for staff {staff_id}")
-                staff_info["screenshot_path"] = None
-        
-        # Calculate inactivity
-        if staff_info.get("last_activity"):
-            try:
-                last_activity = datetime.fromisoformat(staff_info["last_activity"])
-                now = datetime.now()
-                inactive_mins = (now - last_activity).total_seconds() / 60
-                
-                # Update status based on inactivity
-                if inactive_mins > 5:  # Consider inactive after 5 minutes
-                    staff_info["activity_status"] = "inactive"
-            except Exception as e:
-                logger.error(f"Error calculating inactivity: {e}")
-        
-        staff_list.append(staff_info)
+        staff_info = get_staff_info(screenshots_dir, staff_id)
+        if staff_info:
+            staff_list.append(staff_info)
     
     # Now, look for screenshot files directly in the screenshots directory
     # This handles screenshots that might have been saved without the proper directory structure
@@ -780,14 +2721,15 @@ def get_staff_list():
             
             staff_list.append(staff_info)
     
-    # Sort by status (active first) then by name
-    staff_list.sort(key=lambda x: (0 if x["activity_status"] == "active" else 1, x["name"]))
+    # Sort by status (active, idle, inactive) then by name
+    staff_list.sort(key=lambda x: (STATUS_RANK.get(x["activity_status"], 2), x["name"]))
     
     return staff_list
 
 if __name__ == "__main__":
     # Load configuration at startup
     config = load_config()
+    setup_logging(config.get("logging"))
     logger.info("OEKS Team Tracker - Combined Server starting...")
     
     # Register signal handlers
@@ -4,6 +4,8 @@ import logging
 import time
 import shutil
 from datetime import datetime, timedelta
+from frame_store import FrameStore, parse_frame_timestamp
+from frame_activity import purge_activity
 
 # Configure logging
 logging.basicConfig(
@@ -41,7 +43,8 @@ def cleanup_old_screenshots():
     for staff_id in os.listdir(screenshots_dir):
         staff_dir = os.path.join(screenshots_dir, staff_id)
         
-        if not os.path.isdir(staff_dir):
+        # Hidden directories (e.g. .cache) are not staff directories
+        if staff_id.startswith('.') or not os.path.isdir(staff_dir):
             continue
             
         # Process all files in the staff directory
@@ -50,20 +53,64 @@ def cleanup_old_screenshots():
             
             if not os.path.isfile(file_path):
                 continue
+            
+            # Leftover links from an interrupted frame write (ctime changes
+            # on link, so recent ones may still be in flight)
+            if filename.endswith('.tmp'):
+                if time.time() - os.stat(file_path).st_ctime < 3600:
+                    continue
+                try:
+                    os.remove(file_path)
+                    total_removed += 1
+                except Exception as e:
+                    logger.error(f"Failed to remove {file_path}: {e}")
+                continue
                 
-            # Check file modification time
-            file_time = os.path.getmtime(file_path)
+            # Only frames are aged, by the capture time in their name. Hard
+            # links share the blob's mtime, so latest.jpg, metadata and the
+            # like would look as old as the first frame with that content.
+            timestamp = parse_frame_timestamp(staff_id, filename)
+            if timestamp is None:
+                continue
             
-            if file_time < cutoff_timestamp:
+            if timestamp.timestamp() < cutoff_timestamp:
                 file_size = os.path.getsize(file_path)
                 try:
+                    # Frames linked to a shared blob only free space once the
+                    # last reference is gone (see collect_garbage below)
+                    shared = os.stat(file_path).st_nlink > 1
                     os.remove(file_path)
                     total_removed += 1
-                    bytes_freed += file_size
+                    if not shared:
+                        bytes_freed += file_size
                     logger.debug(f"Removed old file: {file_path}")
                 except Exception as e:
                     logger.error(f"Failed to remove {file_path}: {e}")
     
+    # Remove blobs no staff frame references any more
+    blobs_removed, blob_bytes = FrameStore(screenshots_dir).collect_garbage()
+    bytes_freed += blob_bytes
+    logger.info(f"Removed {blobs_removed} unreferenced blobs.")
+    
+    # Drop activity scores for days past the retention period
+    activity_removed, activity_bytes = purge_activity(screenshots_dir, retention_days)
+    total_removed += activity_removed
+    bytes_freed += activity_bytes
+    
+    # Drop cached sprite sheets that are older than the retention period
+    sprite_cache_dir = os.path.join(screenshots_dir, ".cache", "sprites")
+    if os.path.isdir(sprite_cache_dir):
+        for filename in os.listdir(sprite_cache_dir):
+            file_path = os.path.join(sprite_cache_dir, filename)
+            if os.path.isfile(file_path) and os.path.getmtime(file_path) < cutoff_timestamp:
+                file_size = os.path.getsize(file_path)
+                try:
+                    os.remove(file_path)
+                    total_removed += 1
+                    bytes_freed += file_size
+                except Exception as e:
+                    logger.error(f"Failed to remove {file_path}: {e}")
+    
     logger.info(f"Cleanup completed. Removed {total_removed} files, freed {bytes_freed/1024/1024:.2f} MB.")
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger('event_journal')
+
+JOURNAL_DIR = ".journal"
+MAX_SESSIONS_PER_STAFF = 50
+
+class EventJournal:
+    """Append-only journal of staff events with periodic compacted snapshots
+
+    Events (connect, auth, frame, disconnect) are buffered in memory and
+    appended as JSON lines to {screenshots_dir}/.journal/journal.log. The
+    derived state (staff details, last activity, sessions and connected
+    seconds per day) lives in memory. compact() writes it to snapshot.json
+    and starts a fresh journal. Every event has a sequence number and the
+    snapshot records the last one it covers, so replaying a journal that was
+    not truncated after a crash applies nothing twice. A torn last line is
+    skipped on replay.
+    """
+    def __init__(self, screenshots_dir):
+        self.directory = os.path.join(screenshots_dir, JOURNAL_DIR)
+        self.journal_path = os.path.join(self.directory, "journal.log")
+        self.rotated_path = os.path.join(self.directory, "journal.log.old")
+        self.snapshot_path = os.path.join(self.directory, "snapshot.json")
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.seq = 0
+        self.staff = {}    # staff_id -> {"name", "division", "last_activity", "ip", "connected_since"}
+        self.uptime = {}   # staff_id -> {"YYYYMMDD": connected seconds}
+        self.sessions = {} # staff_id -> recent closed sessions, oldest first
+        self.events_since_compaction = 0
+
+    def load(self):
+        """Restore state from the snapshot and replay the journal"""
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r") as f:
+                    snapshot = json.load(f)
+                snapshot_seq = snapshot.get("seq", 0)
+                self.staff = snapshot.get("staff", {})
+                self.uptime = snapshot.get("uptime", {})
+                self.sessions = snapshot.get("sessions", {})
+            except Exception as e:
+                logger.error(f"Error reading journal snapshot: {e}")
+        self.seq = snapshot_seq
+
+        # A journal rotated by an interrupted compaction comes first
+        replayed = 0
+        for path in (self.rotated_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipping unreadable journal line")
+                        continue
+                    if event.get("seq", 0) <= self.seq:
+                        continue
+                    self._apply(event)
+                    self.seq = event["seq"]
+                    replayed += 1
+        self.events_since_compaction = replayed
+
+        # Sessions still open were cut off by a restart; close them at the last activity seen
+        for staff_id, state in self.staff.items():
+            if state.get("connected_since"):
+                self._close_session(staff_id, state.get("last_activity") or state["connected_since"], "restart")
+        logger.info(f"Journal loaded: {len(self.staff)} staff members, {replayed} events replayed")
+
+    def record(self, event_type, staff_id=None, flush=False, **fields):
+        """Record an event; frames are only buffered, other events may flush
+
+        Returns:
+            int: The event's sequence number
+        """
+        with self.lock:
+            self.seq += 1
+            event = {"seq": self.seq, "t": datetime.now().isoformat(), "e": event_type}
+            if staff_id:
+                event["s"] = staff_id
+            event.update(fields)
+            self._apply(event)
+            self.buffer.append(json.dumps(event, separators=(',', ':')))
+            self.events_since_compaction += 1
+        if flush:
+            self.flush()
+        return event["seq"]
+
+    def flush(self):
+        """Append buffered events to the journal file"""
+        with self.lock:
+            if not self.buffer:
+                return
+            lines = "\n".join(self.buffer) + "\n"
+            self.buffer = []
+        try:
+            with open(self.journal_path, "a") as f:
+                f.write(lines)
+        except Exception as e:
+            logger.error(f"Error writing journal: {e}")
+
+    def compact(self, retention_days=None):
+        """Write a snapshot of the current state and start a new journal
+
+        Only serializing the state and rotating the journal happen under the
+        lock; the snapshot is written afterwards, so recording is never held
+        up by disk I/O. Until the snapshot is in place the rotated journal is
+        kept and replayed by load().
+        """
+        self.flush()
+        with self.lock:
+            if retention_days:
+                cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y%m%d")
+                for days in self.uptime.values():
+                    for day in [day for day in days if day < cutoff]:
+                        del days[day]
+            snapshot = json.dumps({
+                "seq": self.seq,
+                "created": datetime.now().isoformat(),
+                "staff": self.staff,
+                "uptime": self.uptime,
+                "sessions": self.sessions
+            })
+            # Events after this point go to a fresh journal
+            if os.path.exists(self.journal_path) and not os.path.exists(self.rotated_path):
+                os.replace(self.journal_path, self.rotated_path)
+            self.events_since_compaction = 0
+
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def staff_state(self, staff_id):
+        """Get a copy of a staff member's details, or None if never seen"""
+        with self.lock:
+            state = self.staff.get(staff_id)
+            return dict(state) if state else None
+
+    def connected_seconds(self, staff_id, day):
+        """Get connected seconds for a staff member on a YYYYMMDD day, including an open session"""
+        with self.lock:
+            seconds = self.uptime.get(staff_id, {}).get(day, 0)
+            state = self.staff.get(staff_id)
+            if state and state.get("connected_since"):
+                for open_day, open_seconds in _split_by_day(state["connected_since"], datetime.now().isoformat()):
+                    if open_day == day:
+                        seconds += open_seconds
+            return round(seconds)
+
+    def sessions_for(self, staff_id, days=7):
+        """Get recent sessions and connected seconds per day for a staff member"""
+        today = datetime.now().date()
+        day_keys = [(today - timedelta(days=offset)).strftime("%Y%m%d") for offset in range(days)]
+        uptime = {day: self.connected_seconds(staff_id, day) for day in day_keys}
+        with self.lock:
+            sessions = list(self.sessions.get(staff_id, []))
+            state = self.staff.get(staff_id)
+            if state and state.get("connected_since"):
+                sessions.append({"start": state["connected_since"], "end": None, "ip": state.get("ip")})
+        return {"staffId": staff_id, "uptime": uptime, "sessions": sessions}
+
+    def _apply(self, event):
+        """Update the derived state for one event (caller holds the lock or is loading)"""
+        staff_id = event.get("s")
+        if not staff_id:
+            return
+        state = self.staff.setdefault(staff_id, {
+            "name": "Unknown User",
+            "division": "Unassigned",
+            "last_activity": None,
+            "ip": None,
+            "connected_since": None
+        })
+        event_type = event["e"]
+        if event_type == "auth":
+            if state.get("connected_since"):
+                self._close_session(staff_id, event["t"], "reconnect")
+            state["name"] = event.get("name", state["name"])
+            state["division"] = event.get("division", state["division"])
+            state["ip"] = event.get("ip")
+            state["connection"] = event["seq"]
+            state["connected_since"] = event["t"]
+            state["last_activity"] = event["t"]
+        elif event_type == "frame":
+            state["last_activity"] = event["t"]
+        elif event_type == "disconnect":
+            # A late disconnect from an older connection must not end the current session
+            connection = event.get("connection")
+            if connection is not None and connection != state.get("connection"):
+                return
+            if state.get("connected_since"):
+                self._close_session(staff_id, event["t"], "disconnect")
+
+    def _close_session(self, staff_id, end, reason):
+        state = self.staff[staff_id]
+        start = state["connected_since"]
+        state["connected_since"] = None
+        if end < start:
+            end = start
+        days = self.uptime.setdefault(staff_id, {})
+        for day, seconds in _split_by_day(start, end):
+            days[day] = days.get(day, 0) + seconds
+        sessions = self.sessions.setdefault(staff_id, [])
+        sessions.append({"start": start, "end": end, "ip": state.get("ip"), "reason": reason})
+        del sessions[:-MAX_SESSIONS_PER_STAFF]
+
+def _split_by_day(start, end):
+    """Split the span between two ISO timestamps into (YYYYMMDD, seconds) pieces"""
+    start = datetime.fromisoformat(start)
+    end = datetime.fromisoformat(end)
+    pieces = []
+    while start < end:
+        midnight = datetime.combine(start.date() + timedelta(days=1), datetime.min.time())
+        piece_end = min(end, midnight)
+        pieces.append((start.strftime("%Y%m%d"), (piece_end - start).total_seconds()))
+        start = piece_end
+    return pieces
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime
+from frame_export import EXPORT_FORMATS, Throttle, list_frames, file_sendfile, stream_tar, stream_zip
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('export_script')
+
+def load_config():
+    try:
+        with open('admin_config.json', 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.error("Configuration file not found.")
+        return {"screenshots_dir": "screenshots"}
+
+def export_frames(staff_id, start=None, end=None, archive_format="tar", output="-"):
+    config = load_config()
+    screenshots_dir = config.get("screenshots_dir", "screenshots")
+    staff_dir = os.path.join(screenshots_dir, staff_id)
+    
+    if not os.path.isdir(staff_dir):
+        logger.error(f"Staff directory '{staff_dir}' does not exist.")
+        return False
+    
+    frames = list_frames(screenshots_dir, staff_id, start, end)
+    throttle = Throttle(config.get("export", {}).get("max_bytes_per_second", 0))
+    logger.info(f"Exporting {len(frames)} frames for {staff_id} as {archive_format}")
+    
+    out = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        if archive_format == "tar":
+            entries = stream_tar(out.write, file_sendfile(out), staff_dir, staff_id, frames, start, end, throttle)
+        else:
+            entries = stream_zip(out.write, staff_dir, staff_id, frames, start, end, throttle)
+        out.flush()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    
+    logger.info(f"Export completed. {len(entries)} frames written to {output}.")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a staff member's frames for a time range")
+    parser.add_argument("staff_id", help="ID of the staff member")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Start time (ISO format, e.g. 2024-03-04T09:00)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="End time (ISO format)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="tar", help="Archive format")
+    parser.add_argument("--output", default="-", help="Output file, or - for stdout")
+    args = parser.parse_args()
+    
+    if not export_frames(args.staff_id, args.start, args.end, args.format, args.output):
+        sys.exit(1)
@@ -0,0 +1,157 @@
+import io
+import os
+import logging
+import threading
+from array import array
+from datetime import datetime, timedelta
+from PIL import Image, ImageChops
+from frame_store import parse_frame_timestamp
+
+logger = logging.getLogger('frame_activity')
+
+ACTIVITY_DIR = ".activity"
+SIGNATURE_SIZE = (64, 36)  # Grayscale grid compared between frames
+NOISE_LEVEL = 12           # Per-cell difference treated as JPEG noise
+
+def frame_signature(data):
+    """Decode a JPEG at reduced scale into a small grayscale image"""
+    with Image.open(io.BytesIO(data)) as image:
+        # draft() lets the JPEG decoder skip most of the work at 1/2..1/8 scale
+        image.draft('L', (SIGNATURE_SIZE[0] * 2, SIGNATURE_SIZE[1] * 2))
+        return image.convert('L').resize(SIGNATURE_SIZE, Image.BILINEAR)
+
+def change_score(previous, current):
+    """Score the change between two signatures from 0 (identical) to 255 (every cell)
+
+    The score is the share of grid cells whose brightness moved by more than
+    NOISE_LEVEL. Any visible change scores at least 1.
+    """
+    changed_mask = ImageChops.difference(previous, current).point(lambda value: 255 if value > NOISE_LEVEL else 0)
+    changed = changed_mask.histogram()[255]
+    if not changed:
+        return 0
+    return max(1, round(255 * changed / (SIGNATURE_SIZE[0] * SIGNATURE_SIZE[1])))
+
+class ActivityIndex:
+    """Per-frame change scores, one compact array per staff member and day
+
+    Each frame is one array('I') entry packing seconds since midnight and
+    the score (seconds << 8 | score), persisted append-only to
+    {screenshots_dir}/.activity/{staff_id}/YYYYMMDD.bin. Queries read only
+    these arrays, never image data.
+    """
+    def __init__(self, screenshots_dir):
+        self.directory = os.path.join(screenshots_dir, ACTIVITY_DIR)
+        self.lock = threading.Lock()
+        self.days = {}        # (staff_id, "YYYYMMDD") -> packed entries of days being ingested
+        self.pending = {}     # (staff_id, "YYYYMMDD") -> array not yet written
+        self.signatures = {}  # staff_id -> signature of the previous frame
+
+    def day_path(self, staff_id, day):
+        return os.path.join(self.directory, staff_id, f"{day}.bin")
+
+    def record(self, staff_id, filename, data):
+        """Score a frame against the staff member's previous frame
+
+        Returns:
+            int: The score, or None if the frame could not be scored
+        """
+        timestamp = parse_frame_timestamp(staff_id, filename)
+        if timestamp is None:
+            return None
+        try:
+            signature = frame_signature(data)
+        except Exception as e:
+            logger.warning(f"Could not score frame {filename}: {e}")
+            return None
+
+        with self.lock:
+            previous = self.signatures.get(staff_id)
+            self.signatures[staff_id] = signature
+        # The first frame seen for a staff member counts as a full change
+        score = change_score(previous, signature) if previous is not None else 255
+
+        day = timestamp.strftime("%Y%m%d")
+        entry = (timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second) << 8 | score
+        key = (staff_id, day)
+        with self.lock:
+            if key not in self.days:
+                self.days[key] = self._read(staff_id, day)
+            self.days[key].append(entry)
+            self.pending.setdefault(key, array('I')).append(entry)
+        return score
+
+    def flush(self):
+        """Append pending entries to their day files"""
+        today = datetime.now().strftime("%Y%m%d")
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            # Finished days are read from disk from now on
+            for key in [key for key in self.days if key[1] < today and key not in pending]:
+                del self.days[key]
+        for (staff_id, day), entries in pending.items():
+            try:
+                path = self.day_path(staff_id, day)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'ab') as f:
+                    entries.tofile(f)
+            except Exception as e:
+                logger.error(f"Error writing activity for {staff_id}: {e}")
+
+    def _read(self, staff_id, day):
+        entries = array('I')
+        path = self.day_path(staff_id, day)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Drop a torn trailing entry
+            entries.frombytes(data[:len(data) - len(data) % entries.itemsize])
+        return entries
+
+    def _day(self, staff_id, day):
+        with self.lock:
+            entries = self.days.get((staff_id, day))
+            if entries is not None:
+                return array('I', entries)
+        return self._read(staff_id, day)
+
+    def scores(self, staff_id, day):
+        """Get {seconds since midnight: score} for a staff member's day"""
+        return {entry >> 8: entry & 0xFF for entry in self._day(staff_id, day)}
+
+    def heatmap(self, staff_id, day, bucket_minutes=1):
+        """Get the highest score per bucket of a day (None where there are no frames)"""
+        buckets = [None] * (1440 // bucket_minutes + (1440 % bucket_minutes > 0))
+        for entry in self._day(staff_id, day):
+            index = (entry >> 8) // 60 // bucket_minutes
+            score = entry & 0xFF
+            if buckets[index] is None or score > buckets[index]:
+                buckets[index] = score
+        return buckets
+
+def purge_activity(screenshots_dir, retention_days):
+    """Remove activity day files older than the retention period
+
+    Returns:
+        tuple: (files removed, bytes freed)
+    """
+    directory = os.path.join(screenshots_dir, ACTIVITY_DIR)
+    cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y%m%d")
+    removed = 0
+    bytes_freed = 0
+    if not os.path.isdir(directory):
+        return removed, bytes_freed
+    for staff_id in os.listdir(directory):
+        staff_dir = os.path.join(directory, staff_id)
+        if not os.path.isdir(staff_dir):
+            continue
+        for filename in os.listdir(staff_dir):
+            if filename.endswith('.bin') and filename[:8] < cutoff:
+                path = os.path.join(staff_dir, filename)
+                try:
+                    bytes_freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+                except Exception as e:
+                    logger.error(f"Failed to remove {path}: {e}")
+    return removed, bytes_freed
@@ -0,0 +1,199 @@
+import os
+import io
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from PIL import Image
+from frame_export import list_frames, Throttle
+
+logger = logging.getLogger('frame_compaction')
+
+STATE_FILE = ".compaction.json"
+
+# Default compaction settings (admin_config.json "compaction")
+DEFAULT_COMPACTION_SETTINGS = {
+    "enabled": True,
+    "interval": 3600,                  # Seconds between compaction passes
+    "cpu_share": 0.25,                 # Fraction of wall time a pass may spend recompressing
+    "max_bytes_per_second": 10485760,  # Disk read budget while recompressing
+    # Age bands, youngest first: frames older than after_hours are fitted
+    # into max_size x max_size and re-encoded at quality
+    "tiers": [
+        {"after_hours": 48, "max_size": 960, "quality": 20},
+        {"after_hours": 168, "max_size": 320, "quality": 40}
+    ]
+}
+
+def recompress(data, max_size, quality):
+    """Downscale and re-encode a JPEG frame
+
+    Returns:
+        bytes: The new JPEG, or None if it would not be smaller
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((max_size, max_size), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+    result = output.getvalue()
+    return result if len(result) < len(data) else None
+
+class FrameCompactor:
+    """Recompresses aging frames at lower resolution and quality in age bands
+
+    Frames keep their filenames, so the frame index, history, sprite sheet
+    and export APIs need no changes. Frames are hard links into the frame
+    store, so a recompressed frame is stored as a new blob and relinked;
+    the old blob is collected by cleanup once nothing references it.
+
+    Progress is kept per staff member and tier as a watermark in
+    {screenshots_dir}/.compaction.json: every frame up to the watermark has
+    reached that tier, so a pass only reads frames that crossed a band since
+    the previous one.
+    """
+    def __init__(self, screenshots_dir, frame_store, settings=None):
+        self.screenshots_dir = screenshots_dir
+        self.frame_store = frame_store
+        self.state_path = os.path.join(screenshots_dir, STATE_FILE)
+        self.settings = dict(DEFAULT_COMPACTION_SETTINGS)
+        self.configure(settings or {})
+        self.lock = threading.Lock()
+        self.frames_compacted = 0
+        self.frames_skipped = 0
+        self.bytes_saved = 0
+        self.last_pass = None
+
+    def configure(self, settings):
+        """Apply compaction settings, keeping defaults for missing keys"""
+        self.settings.update(settings)
+        self.tiers = sorted(self.settings["tiers"], key=lambda tier: tier["after_hours"])
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Error reading compaction state: {e}")
+            return {}
+
+    def save_state(self, state):
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    def run_pass(self, stopped=None):
+        """Bring every staff member's frames up to their age band
+
+        Args:
+            stopped (threading.Event, optional): Ends the pass early when set
+        """
+        state = self.load_state()
+        throttle = Throttle(self.settings["max_bytes_per_second"])
+        cpu_share = min(max(self.settings["cpu_share"], 0.01), 1)
+        now = datetime.now()
+
+        for staff_id in sorted(os.listdir(self.screenshots_dir)):
+            staff_dir = os.path.join(self.screenshots_dir, staff_id)
+            if staff_id.startswith('.') or not os.path.isdir(staff_dir):
+                continue
+            watermarks = state.setdefault(staff_id, {})
+
+            # Deepest tier first, so a frame that skipped a band is recompressed once
+            done_until = None
+            for level in range(len(self.tiers) - 1, -1, -1):
+                tier = self.tiers[level]
+                cutoff = now - timedelta(hours=tier["after_hours"])
+                watermark = watermarks.get(str(level))
+                start = datetime.fromisoformat(watermark) if watermark else None
+                if done_until and (start is None or done_until > start):
+                    start = done_until
+
+                for timestamp, filename in list_frames(self.screenshots_dir, staff_id, start, cutoff):
+                    if stopped is not None and stopped.is_set():
+                        self.save_state(state)
+                        return
+                    if start is not None and timestamp <= start:
+                        continue
+                    started = time.monotonic()
+                    self.compact_frame(staff_dir, filename, tier, throttle)
+                    # Leave the rest of the CPU to ingest and the HTTP server
+                    busy = time.monotonic() - started
+                    time.sleep(busy * (1 - cpu_share) / cpu_share)
+
+                if not watermark or datetime.fromisoformat(watermark) < cutoff:
+                    watermarks[str(level)] = cutoff.isoformat()
+                if done_until is None or cutoff > done_until:
+                    done_until = cutoff
+            self.save_state(state)
+
+        # Forget staff members whose directories are gone
+        for staff_id in [staff_id for staff_id in state
+                         if not os.path.isdir(os.path.join(self.screenshots_dir, staff_id))]:
+            del state[staff_id]
+        self.save_state(state)
+        with self.lock:
+            self.last_pass = now.isoformat()
+
+    def compact_frame(self, staff_dir, filename, tier, throttle):
+        """Recompress one frame in place (a new blob, atomically relinked)"""
+        path = os.path.join(staff_dir, filename)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            throttle.consume(len(data))
+            compacted = recompress(data, tier["max_size"], tier["quality"])
+        except FileNotFoundError:
+            return  # Removed by retention meanwhile
+        except Exception as e:
+            logger.error(f"Error recompressing {path}: {e}")
+            return
+
+        if compacted is None:
+            with self.lock:
+                self.frames_skipped += 1
+            return
+        if self.frame_store:
+            blob_path, _ = self.frame_store.put(compacted)
+            self.frame_store.link(blob_path, path, compacted)
+        else:
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(compacted)
+            os.replace(temp_path, path)
+        with self.lock:
+            self.frames_compacted += 1
+            self.bytes_saved += len(data) - len(compacted)
+
+    def stats(self):
+        """Get compaction counters since startup"""
+        with self.lock:
+            return {
+                "framesCompacted": self.frames_compacted,
+                "framesSkipped": self.frames_skipped,
+                "bytesSaved": self.bytes_saved,
+                "lastPass": self.last_pass
+            }
+
+class CompactionThread(threading.Thread):
+    """Runs compaction passes in the background at the configured interval"""
+    def __init__(self, compactor):
+        threading.Thread.__init__(self)
+        self.compactor = compactor
+        self.daemon = True
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.compactor.run_pass(self.stopped)
+            except Exception as e:
+                logger.error(f"Error in compaction pass: {e}")
+            self.stopped.wait(self.compactor.settings["interval"])
+
+    def stop(self):
+        self.stopped.set()
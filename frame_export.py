@@ -0,0 +1,162 @@
+import os
+import io
+import json
+import time
+import shutil
+import tarfile
+import zipfile
+import logging
+from datetime import datetime
+from frame_store import parse_frame_timestamp
+
+logger = logging.getLogger('frame_export')
+
+CHUNK_SIZE = 1024 * 1024
+EXPORT_FORMATS = ("tar", "zip")
+
+def list_frames(screenshots_dir, staff_id, start=None, end=None):
+    """List a staff member's frames between start and end as (timestamp, filename), oldest first"""
+    staff_dir = os.path.join(screenshots_dir, staff_id)
+    if not os.path.isdir(staff_dir):
+        return []
+
+    frames = []
+    for filename in os.listdir(staff_dir):
+        timestamp = parse_frame_timestamp(staff_id, filename)
+        if timestamp is None or not filename.endswith('.jpg'):
+            continue
+        if (start and timestamp < start) or (end and timestamp > end):
+            continue
+        frames.append((timestamp, filename))
+    frames.sort()
+    return frames
+
+class Throttle:
+    """Sleeps as needed to keep an export under max_bytes_per_second (0 = unlimited)"""
+    def __init__(self, max_bytes_per_second=0):
+        self.max_bytes_per_second = max_bytes_per_second
+        self.started = time.monotonic()
+        self.sent = 0
+
+    def consume(self, size):
+        if not self.max_bytes_per_second:
+            return
+        self.sent += size
+        ahead = self.sent / self.max_bytes_per_second - (time.monotonic() - self.started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+class _StreamWriter(io.RawIOBase):
+    """Non-seekable file object over a write function (for zipfile streaming)"""
+    def __init__(self, write):
+        self._write = write
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._write(bytes(data))
+        return len(data)
+
+def file_sendfile(out):
+    """Get a sendfile(file, count) callable that copies into a binary file object
+
+    Uses os.sendfile where the platform and output support it, and falls
+    back to chunked reads otherwise.
+    """
+    def sendfile(f, count):
+        out.flush()
+        offset = 0
+        try:
+            while offset < count:
+                sent = os.sendfile(out.fileno(), f.fileno(), offset, count - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            f.seek(offset)
+            remaining = count - offset
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                out.write(chunk)
+                remaining -= len(chunk)
+    return sendfile
+
+def _manifest(staff_id, start, end, entries):
+    return json.dumps({
+        "staffId": staff_id,
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "exportedAt": datetime.now().isoformat(),
+        "frameCount": len(entries),
+        "frames": entries
+    }, indent=2).encode()
+
+def stream_tar(write, sendfile, staff_dir, staff_id, frames, start=None, end=None, throttle=None):
+    """Write a tar archive of frames plus manifest.json without buffering files
+
+    Args:
+        write (callable): Writes bytes to the output
+        sendfile (callable): sendfile(file, count) copies count bytes of an open file to the output
+        staff_dir (str): Directory holding the staff member's frames
+        staff_id (str): ID of the staff member
+        frames (list): (timestamp, filename) tuples to include
+        start (datetime, optional): Start of the exported range, for the manifest
+        end (datetime, optional): End of the exported range, for the manifest
+        throttle (Throttle, optional): Limits the export's disk and network rate
+    """
+    entries = []
+    for timestamp, filename in frames:
+        try:
+            f = open(os.path.join(staff_dir, filename), 'rb')
+        except FileNotFoundError:
+            continue  # Removed by retention while exporting
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            info = tarfile.TarInfo(f"{staff_id}/{filename}")
+            info.size = size
+            info.mtime = timestamp.timestamp()
+            write(info.tobuf(format=tarfile.PAX_FORMAT))
+            sendfile(f, size)
+            padding = -size % tarfile.BLOCKSIZE
+            if padding:
+                write(tarfile.NUL * padding)
+        entries.append({"filename": filename, "timestamp": timestamp.isoformat(), "size": size})
+        if throttle:
+            throttle.consume(size)
+
+    manifest = _manifest(staff_id, start, end, entries)
+    info = tarfile.TarInfo(f"{staff_id}/manifest.json")
+    info.size = len(manifest)
+    info.mtime = time.time()
+    write(info.tobuf(format=tarfile.PAX_FORMAT) + manifest + tarfile.NUL * (-len(manifest) % tarfile.BLOCKSIZE))
+    write(tarfile.NUL * (tarfile.BLOCKSIZE * 2))
+    return entries
+
+def stream_zip(write, staff_dir, staff_id, frames, start=None, end=None, throttle=None):
+    """Write a ZIP archive (stored, not deflated) of frames plus manifest.json
+
+    JPEG frames do not compress further, so entries are stored and copied in
+    CHUNK_SIZE pieces; memory use does not depend on the export size.
+    """
+    entries = []
+    with zipfile.ZipFile(_StreamWriter(write), mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for timestamp, filename in frames:
+            try:
+                f = open(os.path.join(staff_dir, filename), 'rb')
+            except FileNotFoundError:
+                continue
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                info = zipfile.ZipInfo(f"{staff_id}/{filename}", date_time=timestamp.timetuple()[:6])
+                info.file_size = size
+                with archive.open(info, 'w') as dest:
+                    shutil.copyfileobj(f, dest, CHUNK_SIZE)
+            entries.append({"filename": filename, "timestamp": timestamp.isoformat(), "size": size})
+            if throttle:
+                throttle.consume(size)
+
+        archive.writestr(f"{staff_id}/manifest.json", _manifest(staff_id, start, end, entries))
+    return entries
@@ -0,0 +1,160 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger('frame_store')
+
+BLOBS_DIR = ".blobs"
+TEMP_MIN_AGE = 3600  # Seconds before a leftover .tmp file counts as garbage
+
+def parse_frame_timestamp(staff_id, filename):
+    """Parse the capture time from a {staff_id}-YYYYMMDD-HHMMSS.jpg filename"""
+    name = os.path.splitext(filename)[0]
+    prefix = f"{staff_id}-"
+    if name.startswith(prefix):
+        name = name[len(prefix):]
+    try:
+        return datetime.strptime(name[-15:], "%Y%m%d-%H%M%S")
+    except ValueError:
+        return None
+
+class FrameStore:
+    """Content-addressed frame store with cross-staff deduplication
+
+    Each unique frame is written once to {screenshots_dir}/.blobs/ab/<sha256>.jpg.
+    Per-staff frames (and latest.jpg) are hard links to the blob, so existing
+    readers of screenshots/{staff_id}/ keep working. The filesystem link count
+    is the reference count: deleting a staff frame drops a reference, and a blob
+    whose only remaining link is its own is garbage.
+    """
+    def __init__(self, screenshots_dir):
+        self.screenshots_dir = screenshots_dir
+        self.blobs_dir = os.path.join(screenshots_dir, BLOBS_DIR)
+        self.lock = threading.Lock()
+        self.frames_stored = 0
+        self.deduplicated = 0
+        self.bytes_received = 0
+        self.bytes_written = 0
+
+    def blob_path(self, digest):
+        """Get the path of the blob for a content hash"""
+        return os.path.join(self.blobs_dir, digest[:2], f"{digest}.jpg")
+
+    def put(self, data):
+        """Store data as a blob if it is new
+
+        Returns:
+            tuple: (blob path, True if the blob already existed)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return path, True
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path, False
+
+    def link(self, blob_path, dest_path, data=None):
+        """Point dest_path at a blob, replacing any existing file atomically
+
+        Falls back to a plain copy of data when hard links are not possible
+        (unsupported filesystem or the blob hit the link limit).
+        """
+        temp_path = f"{dest_path}.{threading.get_ident()}.tmp"
+        try:
+            os.link(blob_path, temp_path)
+            linked = True
+        except OSError as e:
+            if data is None:
+                with open(blob_path, 'rb') as f:
+                    data = f.read()
+            logger.debug(f"Hard link failed for {dest_path}, writing a copy: {e}")
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            linked = False
+        os.replace(temp_path, dest_path)
+        # rename() is a no-op when both names already link the same blob
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return linked
+
+    def store_frame(self, staff_dir, filename, data, latest_name="latest.jpg"):
+        """Store a staff frame and update the staff member's latest frame
+
+        Returns:
+            str: Path of the staff frame
+        """
+        blob_path, existed = self.put(data)
+        frame_path = os.path.join(staff_dir, filename)
+        linked = self.link(blob_path, frame_path, data)
+        if latest_name:
+            self.link(blob_path, os.path.join(staff_dir, latest_name), data)
+
+        with self.lock:
+            self.frames_stored += 1
+            self.bytes_received += len(data)
+            if existed and linked:
+                self.deduplicated += 1
+            else:
+                self.bytes_written += len(data)
+        return frame_path
+
+    def refcount(self, blob_path):
+        """Get the number of staff frames referencing a blob"""
+        try:
+            return os.stat(blob_path).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def collect_garbage(self):
+        """Remove blobs that no staff frame references any more
+
+        Returns:
+            tuple: (blobs removed, bytes freed)
+        """
+        removed = 0
+        bytes_freed = 0
+        if not os.path.isdir(self.blobs_dir):
+            return removed, bytes_freed
+
+        for prefix in os.listdir(self.blobs_dir):
+            prefix_dir = os.path.join(self.blobs_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for filename in os.listdir(prefix_dir):
+                path = os.path.join(prefix_dir, filename)
+                try:
+                    stat = os.stat(path)
+                    if filename.endswith('.tmp'):
+                        # Leftovers from an interrupted write, unless recent
+                        # enough to still be in flight (ctime changes on link)
+                        garbage = time.time() - stat.st_ctime >= TEMP_MIN_AGE
+                    else:
+                        garbage = stat.st_nlink <= 1
+                    if garbage:
+                        os.remove(path)
+                        removed += 1
+                        bytes_freed += stat.st_size
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to collect blob {path}: {e}")
+        return removed, bytes_freed
+
+    def stats(self):
+        """Get ingest deduplication counters since startup"""
+        with self.lock:
+            return {
+                "framesStored": self.frames_stored,
+                "deduplicated": self.deduplicated,
+                "bytesReceived": self.bytes_received,
+                "bytesWritten": self.bytes_written,
+                "dedupRatio": round(self.deduplicated / self.frames_stored, 3) if self.frames_stored else 0
+            }
@@ -5,16 +5,25 @@
 
 // Store staff data
 let staffMembers = {};
-let divisionsList = new Set();
+let divisionCounts = {};
 let namesList = new Set();
 let totalScreenshots = 0;
+let staffPageETag = null;
+let staffPage = { page: 1, pages: 1, total: 0 };
 let filters = {
     division: "all",
     name: "all",
     status: "all",
-    search: ""
+    search: "",
+    page: 1
 };
 
+// Staff cards per page of the server-side staff list
+const STAFF_PAGE_SIZE = 48;
+
+// Staff data each card was rendered from, so unchanged cards are kept
+const renderedCards = new WeakMap();
+
 /**
  * Update filter dropdowns
  */
@@ -35,11 +44,11 @@ function updateFilterOptions() {
         nameDropdown.remove(1);
     }
     
-    // Add new options
-    divisionsList.forEach(division => {
+    // Add new options; divisions come with server-side counts for the whole directory
+    Object.keys(divisionCounts).forEach(division => {
         const option = document.createElement('option');
         option.value = division;
-        option.textContent = division;
+        option.textContent = `${division} (${divisionCounts[division].total})`;
         divisionDropdown.appendChild(option);
     });
     
@@ -61,77 +70,49 @@ function updateFilterOptions() {
 }
 
 /**
- * Apply filters to staff grid
+ * Build the staff list URL for the current filters and page
+ * Filtering, sorting and paging happen on the server
+ * @returns {string} Staff list API URL
  */
-function applyFilters() {
-    const staffCards = document.querySelectorAll('.staff-card');
-    let visibleCount = 0;
-    
-    staffCards.forEach(card => {
-        const staffId = card.id.replace('staff-', '');
-        const staff = staffMembers[staffId];
-        
-        if (!staff) {
-            card.style.display = 'none';
-            return;
-        }
-        
-        const now = new Date();
-        const timestamp = new Date(staff.timestamp);
-        const timeDiff = Math.round((now - timestamp) / 1000);
-        const isActive = timeDiff < 60;
-        
-        // Apply division filter
-        const divisionMatch = filters.division === 'all' || staff.division === filters.division;
-        
-        // Apply name filter
-        const nameMatch = filters.name === 'all' || staff.name === filters.name;
-        
-        // Apply status filter
-        const statusMatch = filters.status === 'all' || 
-                           (filters.status === 'active' && isActive) || 
-                           (filters.status === 'inactive' && !isActive);
-        
-        // Apply search filter
-        const searchMatch = filters.search === '' || 
-                            staff.name.toLowerCase().includes(filters.search) || 
-                            staff.division.toLowerCase().includes(filters.search) ||
-                            staffId.toLowerCase().includes(filters.search);
-        
-        // Show/hide based on filters
-        if (divisionMatch && nameMatch && statusMatch && searchMatch) {
-            card.style.display = '';
-            visibleCount++;
-        } else {
-            card.style.display = 'none';
-        }
+function buildStaffListUrl() {
+    const params = new URLSearchParams({
+        sort: 'status',
+        page: filters.page,
+        page_size: STAFF_PAGE_SIZE
     });
     
-    // Show empty state if no cards visible
-    if (visibleCount === 0 && Object.keys(staffMembers).length > 0) {
-        const staffGrid = document.getElementById('staff-grid');
-        
-        // Only add empty state if it doesn't already exist
-        if (!document.querySelector('.empty-filter-state')) {
-            staffGrid.innerHTML += `
-                <div class="empty-state empty-filter-state">
-                    <i class="fas fa-filter"></i>
-                    <p>Mevcut filtrelerle eşleşen personel bulunamadı</p>
-                    <button id="reset-filters-btn" style="margin-top: 15px;">
-                        <i class="fas fa-times"></i> Filtreleri Temizle
-                    </button>
-                </div>
-            `;
-            
-            document.getElementById('reset-filters-btn').addEventListener('click', resetFilters);
-        }
-    } else {
-        // Remove empty filter state if it exists
-        const emptyState = document.querySelector('.empty-filter-state');
-        if (emptyState) {
-            emptyState.remove();
-        }
-    }
+    if (filters.division !== 'all') params.set('division', filters.division);
+    if (filters.status !== 'all') params.set('status', filters.status);
+    
+    // A selected name wins over the search box; both match name prefixes
+    const name = filters.name !== 'all' ? filters.name : filters.search;
+    if (name) params.set('name', name);
+    
+    return `/api/staff-list?${params}`;
+}
+
+/**
+ * Check whether any filter is active
+ * @returns {boolean} True if the staff list is filtered
+ */
+function hasActiveFilters() {
+    return filters.division !== 'all' || filters.name !== 'all' ||
+        filters.status !== 'all' || filters.search !== '';
+}
+
+/**
+ * Apply the filter controls and fetch the first matching page
+ */
+function applyFilters() {
+    filters.division = document.getElementById('division-filter').value;
+    filters.name = document.getElementById('name-filter').value;
+    filters.status = document.getElementById('status-filter').value;
+    filters.search = document.getElementById('search-input').value.trim();
+    filters.page = 1;
+    
+    // The filters changed, so the cached ETag says nothing about this page
+    staffPageETag = null;
+    return fetchStaffData();
 }
 
 /**
@@ -143,77 +124,102 @@ function resetFilters() {
     document.getElementById('status-filter').value = 'all';
     document.getElementById('search-input').value = '';
     
-    filters = {
-        division: 'all',
-        name: 'all',
-        status: 'all',
-        search: ''
-    };
-    
     applyFilters();
 }
 
+/**
+ * Go to another page of the staff list
+ * @param {number} page - Page number (from 1)
+ */
+function goToStaffPage(page) {
+    if (page < 1 || page > staffPage.pages || page === filters.page) return;
+    
+    filters.page = page;
+    staffPageETag = null;
+    fetchStaffData();
+}
+
+/**
+ * Update the pagination controls below the staff grid
+ */
+function updatePagination() {
+    const pagination = document.getElementById('staff-pagination');
+    if (!pagination) return;
+    
+    pagination.style.display = staffPage.pages > 1 ? '' : 'none';
+    document.getElementById('staff-page-label').textContent =
+        `Sayfa ${staffPage.page}/${staffPage.pages} (${staffPage.total} personel)`;
+    document.getElementById('staff-prev-page').disabled = staffPage.page <= 1;
+    document.getElementById('staff-next-page').disabled = staffPage.page >= staffPage.pages;
+}
+
 /**
  * Update statistics
  * @param {Object} data - Staff data from API
  */
 function updateStats(data) {
     const now = new Date();
-    let activeCount = 0;
+    const counts = data.statusCounts || {};
     
-    // Count active staff
-    Object.keys(data.staffData || {}).forEach(staffId => {
-        const staff = data.staffData[staffId];
-        if (staff && staff.recording_status === 'active') {
-            activeCount++;
-        }
-    });
+    // Counts cover the whole directory, not just the current page
+    const total = Object.values(counts).reduce((sum, count) => sum + count, 0);
     
-    document.getElementById('total-staff').textContent = data.staffList ? data.staffList.length.toString() : '0';
-    document.getElementById('active-staff').textContent = activeCount.toString();
+    document.getElementById('total-staff').textContent = total.toString();
+    document.getElementById('active-staff').textContent = (counts.active || 0).toString();
     document.getElementById('last-update').textContent = now.toLocaleTimeString();
     document.getElementById('total-screenshots').textContent = totalScreenshots.toString();
 }
 
 /**
- * Fetch staff data from server
+ * Fetch the current page of staff data from the server
+ * Sends the page's last ETag so polls get a 304 until the page itself changes
  * @returns {Promise} Promise that resolves when fetch completes
  */
 function fetchStaffData() {
-    // Get list of staff directories
-    return fetch('/api/staff-list')
+    // Revalidate by hand; the browser cache would turn the 304 into a 200
+    const headers = staffPageETag ? { 'If-None-Match': staffPageETag } : {};
+    return fetch(buildStaffListUrl(), { cache: 'no-store', headers })
         .then(response => {
+            // Nothing changed on this page since our version
+            if (response.status === 304) {
+                return null;
+            }
             if (!response.ok) {
                 throw new Error('İstek başarısız oldu');
             }
+            staffPageETag = response.headers.get('ETag');
             return response.json();
         })
         .then(data => {
-            // Log the entire API response for debugging
-            console.log('Staff API Response:', data);
-            console.log('Staff List Length:', data.staffList ? data.staffList.length : 0);
-            console.log('Staff Data Keys:', Object.keys(data.staffData || {}));
-            
-            // Store staff data globally
-            staffMembers = data.staffData || {};
+            if (!data) {
+                document.getElementById('last-update').textContent = new Date().toLocaleTimeString();
+                updateConnectionStatus('connected');
+                return;
+            }
             
-            // Update the lists of divisions and names for filters
-            divisionsList = new Set();
-            namesList = new Set();
+            staffPage = { page: data.page || 1, pages: data.pages || 1, total: data.total || 0 };
             
-            Object.values(staffMembers).forEach(staff => {
-                if (staff.division) divisionsList.add(staff.division);
-                if (staff.name) namesList.add(staff.name);
-            });
+            // The page went away (e.g. fewer matches now); show the last one
+            if (filters.page > staffPage.pages) {
+                goToStaffPage(staffPage.pages);
+                return;
+            }
             
-            // Update filter dropdowns
-            updateFilterOptions();
+            // Store the page's staff data globally, keeping the open live view's entry
+            const liveViewEntry = typeof liveViewStaffId !== 'undefined' && liveViewStaffId
+                ? staffMembers[liveViewStaffId] : null;
+            staffMembers = data.staffData || {};
+            if (liveViewEntry && !staffMembers[liveViewStaffId]) {
+                staffMembers[liveViewStaffId] = liveViewEntry;
+            }
+            refreshStaffFilters(data);
             
             // Update stats
             updateStats(data);
             
             // Update the dashboard with new data
             updateDashboard(data);
+            updatePagination();
             
             // Update live view if open, the function exists, and the staff ID is valid
             if (typeof liveViewStaffId !== 'undefined' && 
@@ -221,7 +227,6 @@ function fetchStaffData() {
                 typeof updateLiveView === 'function' &&
                 liveViewStaffId !== 'unknown' &&
                 staffMembers[liveViewStaffId]) {  // Make sure staff exists in our data
-                console.log(`Refreshing live view for ${liveViewStaffId}`);
                 updateLiveView(liveViewStaffId);
             }
             
@@ -231,11 +236,29 @@ function fetchStaffData() {
             console.error('Veri çekme hatası:', error);
             updateConnectionStatus('error');
             
+            // Start over with a fresh page on the next poll
+            staffPageETag = null;
+            
             // If API isn't available yet, fallback to directory scan
             fallbackToDirectoryScan();
         });
 }
 
+/**
+ * Rebuild the division and name filter options
+ * @param {Object} data - Staff list page from API
+ */
+function refreshStaffFilters(data) {
+    divisionCounts = data.divisions || {};
+    // Names cover the whole directory, not just the current page
+    namesList = new Set(data.names || []);
+    
+    // Keep the selected name available while it filters the list
+    if (filters.name !== 'all') namesList.add(filters.name);
+    
+    updateFilterOptions();
+}
+
 /**
  * Fallback to directory scan if API isn't available
  */
@@ -248,8 +271,106 @@ function fallbackToDirectoryScan() {
     updateDashboard(emptyData);
 }
 
+/**
+ * Build the HTML for a single staff card
+ * @param {string} staffId - ID of the staff member
+ * @param {Object} staffInfo - Staff data from API
+ * @returns {string} Card HTML
+ */
+function buildStaffCardHTML(staffId, staffInfo) {
+    // Determine if the screenshot path is valid
+    const hasValidScreenshot = staffInfo.screenshot_path && 
+                         staffInfo.screenshot_path !== "null" && 
+                         staffInfo.screenshot_path !== null && 
+                         !staffInfo.screenshot_path.includes("/null");
+    
+    console.log(`Staff ${staffId} screenshot path: ${staffInfo.screenshot_path}, valid: ${hasValidScreenshot}`);
+    
+    // Create card HTML
+    let cardHTML = `
+        <div id="staff-${staffId}" class="staff-card" data-staff-id="${staffId}" data-name="${staffInfo.name}" data-division="${staffInfo.division}">
+            <div class="staff-header">
+                <span>
+                    <span class="status-indicator status-${staffInfo.recording_status}"></span>
+                    ${staffInfo.name}
+                </span>
+                <span class="staff-division">${staffInfo.division}</span>
+            </div>
+            <div class="screenshot-container" onclick="openModal('${staffId}')">
+    `;
+    
+    // Add screenshot or placeholder based on screenshot path
+    if (hasValidScreenshot) {
+        // Get a clean path and timestamp for cache busting
+        const timestamp = Date.now();
+        let cleanPath = staffInfo.screenshot_path;
+        
+        // Remove any existing query parameters for clean URL generation
+        if (cleanPath.includes('?')) {
+            cleanPath = cleanPath.split('?')[0];
+        }
+        
+        // Add timestamp to prevent browser caching
+        const screenshotPath = `${cleanPath}?t=${timestamp}`;
+        
+        cardHTML += `
+            <img class="staff-screenshot" src="${screenshotPath}" alt="${staffInfo.name} ekranı">
+            <div class="overlay">
+                <i class="fas fa-search-plus"></i>
+            </div>
+        `;
+    } else {
+        // Show placeholder
+        cardHTML += `
+            <div class="placeholder-screenshot">
+                <div class="no-screenshot-message">
+                    <i class="fas fa-image-slash"></i>
+                    <p>Görüntü yok</p>
+                    <p>İzleme Durumu: ${staffInfo.recording_status}</p>
+                    <p>${new Date(staffInfo.timestamp).toLocaleTimeString('tr-TR')}</p>
+                </div>
+            </div>
+            <div class="overlay">
+                <i class="fas fa-search-plus"></i>
+            </div>
+        `;
+    }
+    
+    // Close screenshot container and card
+    cardHTML += `
+            </div>
+            <div class="staff-footer">
+                <span class="staff-info">
+                    <i class="fas fa-clock"></i> ${formatTimeAgo(staffInfo.timestamp)}
+                </span>
+                <button class="view-btn" onclick="openModal('${staffId}')">
+                    <i class="fas fa-eye"></i> İzle
+                </button>
+            </div>
+        </div>
+    `;
+    
+    return cardHTML;
+}
+
+/**
+ * Create a staff card element
+ * @param {string} staffId - ID of the staff member
+ * @param {Object} staffInfo - Staff data from API
+ * @returns {Element} Card element
+ */
+function createStaffCard(staffId, staffInfo) {
+    const template = document.createElement('template');
+    template.innerHTML = buildStaffCardHTML(staffId, staffInfo).trim();
+    const card = template.content.firstElementChild;
+    renderedCards.set(card, JSON.stringify(staffInfo));
+    return card;
+}
+
 /**
  * Update the dashboard with new data
+ * Only cards whose staff data changed are rebuilt; the others keep their
+ * elements (and loaded screenshots) and are just moved into the new order
  * @param {Object} data - Staff data from API
  */
 function updateDashboard(data) {
@@ -257,12 +378,24 @@ function updateDashboard(data) {
     const staffGrid = document.getElementById('staff-grid');
     const { staffList, staffData } = data;
     
-    // Clear any previous content
-    staffGrid.innerHTML = '';
-    
     console.log('Updating dashboard with staff list:', staffList);
     console.log('Staff data:', staffData);
     
+    // Nothing matches the filters, but there is staff to show without them
+    if ((!staffList || staffList.length === 0) && hasActiveFilters()) {
+        staffGrid.innerHTML = `
+            <div class="empty-state empty-filter-state">
+                <i class="fas fa-filter"></i>
+                <p>Mevcut filtrelerle eşleşen personel bulunamadı</p>
+                <button id="reset-filters-btn" style="margin-top: 15px;">
+                    <i class="fas fa-times"></i> Filtreleri Temizle
+                </button>
+            </div>
+        `;
+        document.getElementById('reset-filters-btn').addEventListener('click', resetFilters);
+        return;
+    }
+    
     // If no staff members found, show empty state
     if (!staffList || staffList.length === 0) {
         console.warn('No staff members found in staff list');
@@ -281,14 +414,15 @@ function updateDashboard(data) {
         return;
     }
     
-    // Keep track of total staff and active staff for stats
-    let totalStaff = staffList.length;
-    let activeStaff = 0;
+    // Cards currently on the grid, by staff ID
+    const currentCards = new Map();
+    staffGrid.querySelectorAll('.staff-card[data-staff-id]').forEach(card => {
+        currentCards.set(card.dataset.staffId, card);
+    });
     
     // Process each staff member
+    const cards = [];
     staffList.forEach(staffId => {
-        console.log(`Processing staff member: ${staffId}`);
-        
         // Skip if no staff data
         if (!staffData || !staffData[staffId]) {
             console.warn(`No data found for staff ID: ${staffId}`);
@@ -296,123 +430,40 @@ function updateDashboard(data) {
         }
         
         const staffInfo = staffData[staffId];
-        console.log(`Staff info:`, staffInfo);
-        
-        // Count active staff
-        if (staffInfo.recording_status === 'active') {
-            activeStaff++;
-        }
-        
-        // Determine if the screenshot path is valid
-        const hasValidScreenshot = staffInfo.screenshot_path && 
-                             staffInfo.screenshot_path !== "null" && 
-                             staffInfo.screenshot_path !== null && 
-                             !staffInfo.screenshot_path.includes("/null");
-        
-        console.log(`Staff ${staffId} screenshot path: ${staffInfo.screenshot_path}, valid: ${hasValidScreenshot}`);
+        let card = currentCards.get(staffId);
         
-        // Create card HTML
-        let cardHTML = `
-            <div id="staff-${staffId}" class="staff-card" data-staff-id="${staffId}" data-name="${staffInfo.name}" data-division="${staffInfo.division}">
-                <div class="staff-header">
-                    <span>
-                        <span class="status-indicator status-${staffInfo.recording_status}"></span>
-                        ${staffInfo.name}
-                    </span>
-                    <span class="staff-division">${staffInfo.division}</span>
-                </div>
-                <div class="screenshot-container" onclick="openModal('${staffId}')">
-        `;
-        
-        // Add screenshot or placeholder based on screenshot path
-        if (hasValidScreenshot) {
-            // Get a clean path and timestamp for cache busting
-            const timestamp = Date.now();
-            let cleanPath = staffInfo.screenshot_path;
-            
-            // Remove any existing query parameters for clean URL generation
-            if (cleanPath.includes('?')) {
-                cleanPath = cleanPath.split('?')[0];
-            }
-            
-            // Add timestamp to prevent browser caching
-            const screenshotPath = `${cleanPath}?t=${timestamp}`;
-            
-            cardHTML += `
-                <img class="staff-screenshot" src="${screenshotPath}" alt="${staffInfo.name} ekranı">
-                <div class="overlay">
-                    <i class="fas fa-search-plus"></i>
-                </div>
-            `;
+        if (card && renderedCards.get(card) === JSON.stringify(staffInfo)) {
+            // Unchanged; only the relative time moves on
+            card.querySelector('.staff-info').innerHTML =
+                `<i class="fas fa-clock"></i> ${formatTimeAgo(staffInfo.timestamp)}`;
         } else {
-            // Show placeholder
-            cardHTML += `
-                <div class="placeholder-screenshot">
-                    <div class="no-screenshot-message">
-                        <i class="fas fa-image-slash"></i>
-                        <p>Görüntü yok</p>
-                        <p>İzleme Durumu: ${staffInfo.recording_status}</p>
-                        <p>${new Date(staffInfo.timestamp).toLocaleTimeString('tr-TR')}</p>
-                    </div>
-                </div>
-                <div class="overlay">
-                    <i class="fas fa-search-plus"></i>
-                </div>
-            `;
+            card = createStaffCard(staffId, staffInfo);
         }
-        
-        // Close screenshot container and card
-        cardHTML += `
-                </div>
-                <div class="staff-footer">
-                    <span class="staff-info">
-                        <i class="fas fa-clock"></i> ${formatTimeAgo(staffInfo.timestamp)}
-                    </span>
-                    <button class="view-btn" onclick="openModal('${staffId}')">
-                        <i class="fas fa-eye"></i> İzle
-                    </button>
-                </div>
-            </div>
-        `;
-        
-        // Add to grid
-        staffGrid.innerHTML += cardHTML;
-        console.log(`Added staff card for ${staffId}`);
+        cards.push(card);
     });
     
-    console.log(`Dashboard updated with ${staffList.length} staff members`);
-    
-    // Update stats
-    updateStats({
-        totalStaff,
-        activeStaff,
-        lastUpdate: new Date().toLocaleTimeString('tr-TR'),
-        totalScreenshots
-    });
+    // Touch the grid only when cards were replaced, added, removed or reordered
+    const children = [...staffGrid.children];
+    if (cards.length !== children.length || cards.some((card, i) => card !== children[i])) {
+        staffGrid.replaceChildren(...cards);
+    }
     
-    // Apply any active filters
-    applyFilters();
+    console.log(`Dashboard updated with ${staffList.length} staff members`);
 }
 
 /**
  * Update staff list from API
  */
 function updateStaffList() {
-    fetch('/api/staff-list')
-        .then(response => response.json())
-        .then(data => {
-            const oldStaffMembers = {...staffMembers};
-            updateDashboard(data);
-            
+    // Ask for the current page in full rather than a 304
+    staffPageETag = null;
+    fetchStaffData()
+        .then(() => {
             // If we're in a modal view, update the detail page too, but NOT the screenshot
             if (liveViewStaffId && staffMembers[liveViewStaffId]) {
                 // Only update the metadata info
                 updateDetailInfo(liveViewStaffId);
             }
-        })
-        .catch(error => {
-            console.error('Veri çekme hatası:', error);
-            updateConnectionStatus('error');
         });
 }
 
@@ -492,7 +543,17 @@ function initializeDashboardControls() {
     document.getElementById('division-filter').addEventListener('change', applyFilters);
     document.getElementById('name-filter').addEventListener('change', applyFilters);
     document.getElementById('status-filter').addEventListener('change', applyFilters);
-    document.getElementById('search-input').addEventListener('input', applyFilters);
+    
+    // Wait for a pause in typing before asking the server
+    let searchTimer = null;
+    document.getElementById('search-input').addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(applyFilters, 250);
+    });
+    
+    // Set up pagination
+    document.getElementById('staff-prev-page').addEventListener('click', () => goToStaffPage(filters.page - 1));
+    document.getElementById('staff-next-page').addEventListener('click', () => goToStaffPage(filters.page + 1));
     
     // Set up refresh button
     document.getElementById('refresh-btn').addEventListener('click', () => {
@@ -502,6 +563,5 @@ function initializeDashboardControls() {
     // Set up refresh interval dropdown
     document.getElementById('refresh-interval').addEventListener('change', function() {
         setupRefresh();
-        applyFilters();
     });
 } 
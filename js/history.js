@@ -8,6 +8,7 @@ let historyItems = [];
 let currentHistoryIndex = 0;
 let historyPlaybackInterval = null;
 let isPlaying = false;
+let historySprite = null;
 
 /**
  * Fetch staff history from the server
@@ -23,6 +24,7 @@ function fetchStaffHistory(staffId, dateFilter = 'all') {
     // Reset history state
     historyItems = [];
     currentHistoryIndex = 0;
+    historySprite = null;
     
     // Stop any playback
     stopHistoryPlayback();
@@ -32,10 +34,15 @@ function fetchStaffHistory(staffId, dateFilter = 'all') {
     document.getElementById('history-timestamp').textContent = '--:--:--';
     document.getElementById('history-counter').textContent = '0/0';
     
-    const url = dateFilter === 'all' 
+    let url = dateFilter === 'all' 
         ? `/api/staff-history/${staffId}?limit=50` 
         : `/api/staff-history/${staffId}?date=${dateFilter}&limit=50`;
     
+    // Let the server drop frames that barely changed from the previous one
+    if (isSkipIdleEnabled()) {
+        url += '&skip_idle=1';
+    }
+    
     return fetch(url)
         .then(response => {
             if (!response.ok) {
@@ -62,8 +69,9 @@ function fetchStaffHistory(staffId, dateFilter = 'all') {
                 dateFilter.appendChild(option);
             });
             
-            // Update history grid
+            // Update history grid, then swap thumbnails for sprite tiles
             updateHistoryGrid();
+            fetchHistorySpriteSheet(staffId);
             
             // Update playback (if we have items)
             if (historyItems.length > 0) {
@@ -86,6 +94,122 @@ function fetchStaffHistory(staffId, dateFilter = 'all') {
         });
 }
 
+/**
+ * Check whether the "skip idle" history mode is on
+ * @returns {boolean} True if idle frames should be left out
+ */
+function isSkipIdleEnabled() {
+    const skipIdle = document.getElementById('history-skip-idle');
+    return Boolean(skipIdle && skipIdle.checked);
+}
+
+/**
+ * Fetch a sprite sheet covering the loaded history items
+ * One image request replaces a thumbnail request per history item
+ * @param {string} staffId - ID of the staff member
+ * @returns {Promise} Promise that resolves when the sprite sheet is applied
+ */
+function fetchHistorySpriteSheet(staffId) {
+    if (historyItems.length === 0) return Promise.resolve();
+    
+    // History timestamps are the capture times from the frame names, the
+    // same ones the sprite sheet selects by, so the window is exact
+    const times = historyItems.map(item => new Date(item.timestamp).getTime());
+    const toLocalIso = time => new Date(time - new Date(time).getTimezoneOffset() * 60000).toISOString().slice(0, 19);
+    const params = new URLSearchParams({
+        start: toLocalIso(Math.min(...times)),
+        end: toLocalIso(Math.max(...times)),
+        frames: Math.min(historyItems.length + 20, 200),
+        tile_width: 160
+    });
+    
+    return fetch(`/api/sprite-sheet/${staffId}?${params}`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Sprite sheet request failed');
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (!data.sheet || liveViewStaffId !== staffId) return;
+            
+            const tiles = {};
+            (data.frames || []).forEach(frame => {
+                tiles[frame.filename] = frame;
+            });
+            historySprite = { ...data, tiles };
+            applyHistorySpriteSheet();
+        })
+        .catch(error => {
+            // Individual thumbnails keep working without the sprite sheet
+            console.warn('Sprite sheet unavailable:', error);
+        });
+}
+
+/**
+ * Get the inline style that shows a history item's sprite tile
+ * @param {Object} item - History item
+ * @returns {string|null} CSS style or null if the item has no tile
+ */
+function getSpriteTileStyle(item) {
+    if (!historySprite || !item) return null;
+    const tile = historySprite.tiles[item.filename];
+    if (!tile) return null;
+    
+    return `background-image:url('${historySprite.sheet}');` +
+        `background-position:-${tile.x}px -${tile.y}px;` +
+        `width:${historySprite.tileWidth}px;height:${historySprite.tileHeight}px;`;
+}
+
+/**
+ * Replace grid thumbnails with tiles from the sprite sheet
+ */
+function applyHistorySpriteSheet() {
+    const historyItemElements = document.querySelectorAll('.history-item');
+    historyItemElements.forEach((element, index) => {
+        const style = getSpriteTileStyle(historyItems[index]);
+        const image = element.querySelector('.history-image');
+        if (!style || !image) return;
+        
+        const tile = document.createElement('div');
+        tile.className = 'history-image history-sprite-tile';
+        tile.setAttribute('style', style);
+        image.replaceWith(tile);
+    });
+}
+
+/**
+ * Show an instant preview while hovering over the timeline
+ * @param {MouseEvent} e - Mouse event on the timeline
+ */
+function showTimelinePreview(e) {
+    const preview = document.getElementById('history-timeline-preview');
+    if (!preview || historyItems.length === 0) return;
+    
+    const timeline = e.currentTarget;
+    const rect = timeline.getBoundingClientRect();
+    const fraction = Math.min(Math.max((e.clientX - rect.left) / rect.width, 0), 0.9999);
+    const item = historyItems[Math.floor(fraction * historyItems.length)];
+    const style = getSpriteTileStyle(item);
+    
+    if (!style) {
+        preview.style.display = 'none';
+        return;
+    }
+    
+    preview.setAttribute('style', style);
+    preview.style.display = 'block';
+    preview.style.left = `${Math.min(Math.max(e.clientX - rect.left - historySprite.tileWidth / 2, 0), rect.width - historySprite.tileWidth)}px`;
+}
+
+/**
+ * Hide the timeline hover preview
+ */
+function hideTimelinePreview() {
+    const preview = document.getElementById('history-timeline-preview');
+    if (preview) preview.style.display = 'none';
+}
+
 /**
  * Update history grid with thumbnails
  */
@@ -110,6 +234,10 @@ function updateHistoryGrid() {
         if (index === currentHistoryIndex) {
             historyItem.classList.add('current');
         }
+        // Frames with no change from the previous one (score 0)
+        if (item.activity === 0) {
+            historyItem.classList.add('idle');
+        }
         
         // Extract time from filename or use timestamp
         let timeDisplay = new Date(item.timestamp).toLocaleTimeString('tr-TR');
@@ -280,6 +408,13 @@ function initializeHistoryControls() {
     const prevBtn = document.getElementById('history-prev-btn');
     const nextBtn = document.getElementById('history-next-btn');
     const dateFilter = document.getElementById('history-date-filter');
+    const skipIdle = document.getElementById('history-skip-idle');
+    const timeline = document.getElementById('history-timeline');
+    
+    if (timeline) {
+        timeline.addEventListener('mousemove', showTimelinePreview);
+        timeline.addEventListener('mouseleave', hideTimelinePreview);
+    }
     
     if (playBtn) playBtn.addEventListener('click', toggleHistoryPlayback);
     if (prevBtn) prevBtn.addEventListener('click', previousHistoryItem);
@@ -292,4 +427,12 @@ function initializeHistoryControls() {
             }
         });
     }
+    
+    if (skipIdle) {
+        skipIdle.addEventListener('change', () => {
+            if (liveViewStaffId) {
+                fetchStaffHistory(liveViewStaffId, dateFilter ? dateFilter.value : 'all');
+            }
+        });
+    }
 } 
\ No newline at end of file
@@ -43,14 +43,15 @@ function openModal(staffId) {
     // Update status if element exists
     const detailStatus = document.getElementById('detail-status');
     if (detailStatus) {
-        detailStatus.textContent = staff.recording_status === 'active' ? 'Aktif' : 'İnaktif';
+        detailStatus.textContent = staff.recording_status === 'active' ? 'Aktif' :
+            (staff.recording_status === 'idle' ? 'Boşta' : 'İnaktif');
     }
     
     // Update status indicator
     const statusIndicator = document.querySelector('.modal-header .status-indicator');
     if (statusIndicator) {
         statusIndicator.className = 'status-indicator ' + 
-            (staff.recording_status === 'active' ? 'status-active' : 'status-inactive');
+            `status-${staff.recording_status === 'active' || staff.recording_status === 'idle' ? staff.recording_status : 'inactive'}`;
     }
     
     // Load screenshot history for this staff member
@@ -80,6 +81,12 @@ function openModal(staffId) {
     const screenshotContainer = document.querySelector('.modal-screenshot-container');
     if (!screenshotContainer) return;
     
+    // Drop any live stream from a previously opened staff member
+    const previousImg = document.getElementById('modal-screenshot');
+    if (previousImg && previousImg.dataset.stream) {
+        previousImg.removeAttribute('src');
+    }
+    
     // Show loading state immediately
     screenshotContainer.innerHTML = `
         <div class="loading-indicator" style="position:absolute; top:0; left:0; right:0; bottom:0; display:flex; justify-content:center; align-items:center; background-color:#111;">
@@ -116,13 +123,19 @@ function loadScreenshotForStaff(staffId, container) {
         const timestamp = Date.now();
         let screenshotUrl;
         
+        // Connected staff are shown through the live stream, which the server
+        // pushes frames into as they arrive; others get their last screenshot
+        const useStream = staff.recording_status === 'active' || staff.recording_status === 'idle';
+        
         try {
             // For all staff, use the screenshot path from staffInfo
             let cleanPath = staff.screenshot_path;
             if (cleanPath.includes('?')) {
                 cleanPath = cleanPath.split('?')[0];
             }
-            screenshotUrl = `${cleanPath}?t=${timestamp}`;
+            screenshotUrl = useStream
+                ? `/api/live-stream/${encodeURIComponent(staffId)}`
+                : `${cleanPath}?t=${timestamp}`;
             
             console.log(`Trying to load screenshot from: ${screenshotUrl}`);
             
@@ -131,6 +144,9 @@ function loadScreenshotForStaff(staffId, container) {
             imgElement.id = 'modal-screenshot';
             imgElement.className = 'modal-screenshot';
             imgElement.alt = `${staff.name} ekranı`;
+            if (useStream) {
+                imgElement.dataset.stream = 'true';
+            }
             
             // Add loading handler
             imgElement.onload = () => {
@@ -200,7 +216,7 @@ function updateDetailInfo(staffId) {
     const statusIndicator = document.querySelector('.modal-header .status-indicator');
     if (statusIndicator) {
         statusIndicator.className = 'status-indicator ' + 
-            (staff.recording_status === 'active' ? 'status-active' : 'status-inactive');
+            `status-${staff.recording_status === 'active' || staff.recording_status === 'idle' ? staff.recording_status : 'inactive'}`;
     }
 }
 
@@ -209,6 +225,14 @@ function updateDetailInfo(staffId) {
  */
 function closeModal() {
     document.getElementById('live-view-modal').style.display = 'none';
+    
+    // Drop the live stream connection
+    const streamImg = document.getElementById('modal-screenshot');
+    if (streamImg && streamImg.dataset.stream) {
+        streamImg.removeAttribute('src');
+        streamImg.remove();
+    }
+    
     if (liveViewIntervalId) {
         clearInterval(liveViewIntervalId);
         liveViewIntervalId = null;
@@ -277,6 +301,10 @@ function _performScreenshotUpdate(staffId) {
     
     // Check if there's an image element already
     const existingImg = document.getElementById('modal-screenshot');
+    if (existingImg && existingImg.dataset.stream) {
+        // The live stream updates itself
+        return;
+    }
     if (existingImg) {
         // Create a new timestamp for cache busting
         const timestamp = Date.now();
@@ -21,6 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger('staff_app')
 
+# Seconds a slow-down lasts when the server does not say
+SLOW_DOWN_SECONDS = 60
+
 # Load configuration
 def load_config():
     try:
@@ -44,7 +47,7 @@ def load_config():
         return default_config
 
 # Screenshot capture function - optimize for quality
-def capture_screenshot(quality=30):
+def capture_screenshot(quality=30, max_width=1920):
     try:
         with mss.mss() as sct:
             # Get all monitors except the first one (which is usually a combined view)
@@ -80,7 +83,7 @@ def capture_screenshot(quality=30):
             
             # Resize to reduce size but keep reasonable quality
             width, height = img.size
-            new_width = min(1920, width)  # Increased max width to accommodate multiple screens
+            new_width = min(max_width, width)  # Max width comes from the capture profile
             new_height = int(height * (new_width / width))
             img = img.resize((new_width, new_height), Image.LANCZOS)
             
@@ -93,6 +96,41 @@ def capture_screenshot(quality=30):
         logger.error(f"Screenshot capture failed: {e}")
         return None
 
+async def receive_control_messages(websocket, capture):
+    """Apply control messages from the admin server to the capture settings"""
+    async for message in websocket:
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            continue
+        
+        if data.get("type") != "control":
+            continue
+        
+        if data.get("action") == "configure":
+            # Capture profile from the admin server; replaces the local settings
+            for key in ("interval", "quality", "max_width"):
+                if key in data:
+                    capture[key] = data[key]
+            capture["base_interval"] = capture["interval"]
+            capture["slowed_until"] = 0
+            logger.info(f"Applied capture profile {data.get('profile')} ({data.get('schedule')}): "
+                        f"interval {capture['interval']}s, quality {capture['quality']}, max width {capture['max_width']}")
+        
+        elif data.get("action") == "slow_down":
+            reason = data.get("reason", "unknown")
+            if "interval" in data and data["interval"] >= capture["interval"]:
+                # Temporary; the send loop returns to base_interval afterwards
+                capture["interval"] = data["interval"]
+                capture["slowed_until"] = time.monotonic() + data.get("duration", SLOW_DOWN_SECONDS)
+                logger.warning(f"Server asked to slow down ({reason}), interval is now {capture['interval']}s")
+            elif "max_frame_bytes" in data:
+                # Frames are too large; lower the quality a step
+                capture["quality"] = max(10, capture["quality"] - 10)
+                logger.warning(f"Server rejected a frame as too large, quality is now {capture['quality']}")
+            else:
+                logger.warning(f"Server asked to slow down ({reason})")
+
 async def send_screenshots():
     """Main function to send screenshots to admin server"""
     config = load_config()
@@ -120,15 +158,25 @@ async def send_screenshots():
                 
                 if response_data.get("status") != "authenticated":
                     logger.error(f"Authentication failed: {response_data.get('message', 'Unknown error')}")
-                    await asyncio.sleep(10)  # Wait before retrying
+                    await asyncio.sleep(response_data.get("retry_after", 10))  # Wait before retrying
                     continue
                 
                 logger.info("Authentication successful")
                 
+                # Capture settings the server may adjust through control messages
+                capture = {"interval": interval, "quality": quality, "max_width": 1920,
+                           "base_interval": interval, "slowed_until": 0}
+                control_task = asyncio.create_task(receive_control_messages(websocket, capture))
+                
                 # Send screenshots at regular intervals
                 while True:
+                    if control_task.done():
+                        # The connection closed or the receiver failed; reconnect
+                        control_task.result()
+                        break
+                    
                     # Capture screenshot
-                    screenshot_data = capture_screenshot(quality)
+                    screenshot_data = capture_screenshot(capture["quality"], capture["max_width"])
                     
                     if screenshot_data:
                         # Create filename with timestamp
@@ -153,8 +201,14 @@ async def send_screenshots():
                     else:
                         logger.warning("Failed to capture screenshot")
                     
+                    # A slow-down from the server has run out
+                    if capture["slowed_until"] and time.monotonic() >= capture["slowed_until"]:
+                        capture["interval"] = capture["base_interval"]
+                        capture["slowed_until"] = 0
+                        logger.info(f"Slow-down expired, interval is back to {capture['interval']}s")
+                    
                     # Sleep for the configured interval
-                    await asyncio.sleep(interval)
+                    await asyncio.sleep(capture["interval"])
                     
         except websockets.exceptions.ConnectionClosed as e:
             logger.error(f"WebSocket connection closed: {e}")